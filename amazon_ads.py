@@ -1,62 +1,200 @@
 """Amazon Sponsored Listings scraper using Playwright."""
 import asyncio
-from typing import List, Optional, Dict, Any
+import sys
+from collections import Counter, defaultdict
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, List, Optional, Dict, Any
 from datetime import datetime
 from urllib.parse import quote
 
-from playwright.async_api import async_playwright, Page, Browser
+import aiohttp
+from playwright.async_api import async_playwright, Page, Browser, BrowserContext, Route
 from bs4 import BeautifulSoup
 
+from .browser import PagePool
 from .models import AdCreative, AdSource, Lead
 from .utils import (
     RateLimiter, retry_on_exception, setup_logger,
     extract_domain, clean_company_name, detect_captcha_block,
-    get_random_user_agent
+    get_random_user_agent, coerce_http_url, HTML_PARSER
 )
 
 logger = setup_logger(__name__)
 
+# Resource types the scraper never reads; aborting them keeps page loads light
+BLOCKED_RESOURCE_TYPES = {'image', 'media', 'font', 'stylesheet', 'other'}
+
+# Amazon's robot check is a form posting to validateCaptcha
+CAPTCHA_SELECTOR = 'form[action*="captcha" i], #captchacharacters'
+
+# Ways Amazon has marked sponsored result cards, in default probe order
+SPONSORED_SELECTORS = [
+    '[data-component-type="sp-sponsored-result"]',
+    '[data-component-type="s-search-result"]:has-text("Sponsored")',
+    '.s-result-item:has(.s-label-popover-default:has-text("Sponsored"))'
+]
+
+# Static-HTML equivalent of SPONSORED_SELECTORS for the plain HTTP fast path
+SPONSORED_CARD_CSS = (
+    '[data-component-type="sp-sponsored-result"], '
+    '[data-component-type="s-search-result"]:-soup-contains("Sponsored")'
+)
+
+# Brand selectors, tried in order within each product card
+BRAND_SELECTORS = [
+    '.s-size-mini.s-spacing-none.s-color-base',
+    '[class*="a-size-base-plus"]',
+    '.a-row.a-size-base.a-color-secondary'
+]
+
+# Reads every matched product card in one round trip instead of one per field
+EXTRACT_PRODUCTS_JS = """
+(elements, brandSelectors) => elements.map(el => {
+    let brand = null;
+    for (const selector of brandSelectors) {
+        const text = el.querySelector(selector)?.innerText;
+        if (text && text.length < 100) {
+            brand = text;
+            break;
+        }
+    }
+    return {
+        title: el.querySelector('h2 a span')?.innerText ?? null,
+        brand: brand,
+        href: el.querySelector('h2 a')?.getAttribute('href') ?? null,
+        asin: el.getAttribute('data-asin'),
+        price: el.querySelector('.a-price-whole')?.innerText ?? null
+    };
+})
+"""
+
+
+async def _block_heavy_resources(route: Route) -> None:
+    """Abort requests for resources that are not needed to read search results."""
+    if route.request.resource_type in BLOCKED_RESOURCE_TYPES:
+        await route.abort()
+    else:
+        await route.continue_()
+
 
 class AmazonAdsScraper:
     """Scraper for Amazon Sponsored Listings."""
     
     BASE_URL = "https://www.amazon.com/s"
+    # Static params are fixed; only the query varies
+    SEARCH_URL_PREFIX = f"{BASE_URL}?ref=nb_sb_noss&k="
     
-    def __init__(self, rate_limiter: Optional[RateLimiter] = None, headless: bool = True):
+    def __init__(
+        self,
+        rate_limiter: Optional[RateLimiter] = None,
+        headless: bool = True,
+        max_concurrency: int = 3,
+        rotate_every: int = 25,
+        browser: Optional[Browser] = None,
+        session: Optional[aiohttp.ClientSession] = None
+    ):
         self.rate_limiter = rate_limiter or RateLimiter(min_delay=3.0, max_delay=5.0)
         self.headless = headless
-        self.browser: Optional[Browser] = None
-        self.page: Optional[Page] = None
+        self.max_concurrency = max_concurrency
+        self.rotate_every = rotate_every
+        self._playwright = None
+        self.browser: Optional[Browser] = browser
+        self._owns_browser = browser is None
+        self._context: Optional[BrowserContext] = None
+        self._pool: Optional[PagePool] = None
+        self._pages_since_rotate = 0
+        self._rotate_lock = asyncio.Lock()
+        self._selector_hits: Counter = Counter()
+        # Plain HTTP session for the fast path; only closed here when we opened it
+        self.session: Optional[aiohttp.ClientSession] = session
+        self._owns_session = session is None
+        self.headers: Dict[str, str] = {}
     
     async def __aenter__(self):
         """Async context manager entry."""
-        playwright = await async_playwright().start()
-        self.browser = await playwright.chromium.launch(headless=self.headless)
+        # Sent per request so a session shared with other scrapers keeps its own defaults
+        self.headers = {
+            'User-Agent': get_random_user_agent(),
+            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+            'Accept-Language': 'en-US,en;q=0.9',
+            'Accept-Encoding': 'gzip, deflate'
+        }
+        if self._owns_session:
+            self.session = aiohttp.ClientSession()
         
-        # Create page with anti-detection measures
-        context = await self.browser.new_context(
+        if self._owns_browser:
+            self._playwright = await async_playwright().start()
+            self.browser = await self._playwright.chromium.launch(headless=self.headless)
+        await self._open_context()
+        return self
+    
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        """Async context manager exit."""
+        await self._close_context()
+        if self.browser and self._owns_browser:
+            await self.browser.close()
+        if self._playwright:
+            await self._playwright.stop()
+        if self.session and self._owns_session:
+            await self.session.close()
+    
+    async def _open_context(self, storage_state: Optional[Dict[str, Any]] = None) -> None:
+        """Create the shared browser context and its page pool."""
+        # Create context with anti-detection measures
+        self._context = await self.browser.new_context(
             user_agent=get_random_user_agent(),
             viewport={'width': 1920, 'height': 1080},
-            locale='en-US'
+            locale='en-US',
+            storage_state=storage_state
         )
+        await self._context.route("**/*", _block_heavy_resources)
         
-        self.page = await context.new_page()
+        self._pool = await PagePool(
+            self._context.new_page,
+            size=self.max_concurrency,
+            page_initiator=self._init_page
+        ).start()
+        self._pages_since_rotate = 0
+    
+    async def _close_context(self) -> None:
+        """Close the page pool and the browser context."""
+        if self._pool:
+            await self._pool.close()
+            self._pool = None
+        if self._context:
+            await self._context.close()
+            self._context = None
+    
+    async def _rotate_context(self) -> None:
+        """Recreate the context, carrying cookies over, to release Playwright's per-context objects."""
+        logger.debug(f"Rotating Amazon browser context after {self._pages_since_rotate} pages")
+        state = await self._context.storage_state()
+        await self._close_context()
+        await self._open_context(storage_state=state)
+    
+    @asynccontextmanager
+    async def _checkout_page(self) -> AsyncIterator[Page]:
+        """Borrow a pool page, rotating the context first when it is due."""
+        async with self._rotate_lock:
+            if self._pages_since_rotate >= self.rotate_every:
+                await self._rotate_context()
+            self._pages_since_rotate += 1
+            pool = self._pool
+            page = await pool.get()
         
+        try:
+            yield page
+        finally:
+            pool.put(page)
+    
+    async def _init_page(self, page: Page) -> None:
+        """Apply one-time setup to a freshly created pool page."""
         # Set additional headers
-        await self.page.set_extra_http_headers({
+        await page.set_extra_http_headers({
             'Accept-Language': 'en-US,en;q=0.9',
             'Accept-Encoding': 'gzip, deflate, br',
             'Cache-Control': 'no-cache'
         })
-        
-        return self
-    
-    async def __aexit__(self, exc_type, exc_val, exc_tb):
-        """Async context manager exit."""
-        if self.page:
-            await self.page.close()
-        if self.browser:
-            await self.browser.close()
     
     @retry_on_exception(max_attempts=2, delay=5.0)
     async def search_sponsored_products(
@@ -65,142 +203,175 @@ class AmazonAdsScraper:
         max_results_per_query: int = 20
     ) -> List[Lead]:
         """Search for sponsored products on Amazon."""
-        if not self.page:
+        if not self._pool:
             raise RuntimeError("Browser not initialized. Use async context manager.")
         
-        all_leads: Dict[str, Lead] = {}
+        sem = asyncio.Semaphore(self.max_concurrency)
         
-        for query in search_queries:
-            logger.info(f"Searching Amazon for: {query}")
-            leads = await self._search_single_query(query, max_results_per_query)
-            
-            # Merge leads
+        async def run_query(query: str) -> List[Lead]:
+            async with sem:
+                logger.info(f"Searching Amazon for: {query}")
+                return await self._search_single_query(query, max_results_per_query)
+        
+        results = await asyncio.gather(*(run_query(query) for query in search_queries))
+        
+        # Merge leads, folding each domain's duplicates into its first lead at once
+        buckets: Dict[str, List[Lead]] = defaultdict(list)
+        for leads in results:
             for lead in leads:
-                if lead.domain in all_leads:
-                    all_leads[lead.domain].merge_with(lead)
-                else:
-                    all_leads[lead.domain] = lead
+                buckets[lead.domain].append(lead)
         
-        return list(all_leads.values())
+        merged = []
+        for first, *duplicates in buckets.values():
+            first.merge_many(duplicates)
+            merged.append(first)
+        return merged
     
     async def _search_single_query(self, query: str, max_results: int) -> List[Lead]:
-        """Search for a single query."""
-        leads = []
-        
+        """Search for a single query, using the browser only when plain HTTP fails."""
         # Build search URL
-        params = {
-            'k': query,
-            'ref': 'nb_sb_noss'
+        url = self.SEARCH_URL_PREFIX + quote(query)
+        
+        leads = await self._try_http_fast_path(url, query, max_results)
+        if leads is not None:
+            return leads
+        
+        return await self._search_with_browser(url, query, max_results)
+    
+    async def _try_http_fast_path(self, url: str, query: str, max_results: int) -> Optional[List[Lead]]:
+        """Fetch the results page without a browser; None means fall back to Playwright."""
+        await self.rate_limiter.await_slot()
+        
+        try:
+            async with self.session.get(url, headers=self.headers) as response:
+                if response.status != 200:
+                    logger.debug(f"Amazon HTTP fast path got {response.status} for query: {query}")
+                    return None
+                html = await response.read()
+        except Exception as e:
+            logger.debug(f"Amazon HTTP fast path failed for query {query}: {e}")
+            return None
+        
+        text = html.decode('utf-8', errors='ignore')
+        if 'Enter the characters you see below' in text or detect_captcha_block(text):
+            logger.debug(f"Amazon HTTP fast path hit a robot check for query: {query}")
+            return None
+        
+        soup = BeautifulSoup(html, HTML_PARSER)
+        records = [self._record_from_card(card) for card in soup.select(SPONSORED_CARD_CSS)]
+        leads = self._leads_from_records(records, query, max_results)
+        if not leads:
+            return None
+        
+        logger.info(f"Found {len(leads)} sponsored products for query: {query} (HTTP)")
+        return leads
+    
+    def _record_from_card(self, card) -> Dict[str, Any]:
+        """Read a static-HTML product card into the same shape EXTRACT_PRODUCTS_JS returns."""
+        def text_of(selector: str) -> Optional[str]:
+            element = card.select_one(selector)
+            return element.get_text(' ', strip=True) if element else None
+        
+        brand = None
+        for selector in BRAND_SELECTORS:
+            brand_text = text_of(selector)
+            if brand_text and len(brand_text) < 100:
+                brand = brand_text
+                break
+        
+        link = card.select_one('h2 a')
+        return {
+            'title': text_of('h2 a span'),
+            'brand': brand,
+            'href': link.get('href') if link else None,
+            'asin': card.get('data-asin'),
+            'price': text_of('.a-price-whole')
         }
-        url = f"{self.BASE_URL}?{'&'.join(f'{k}={quote(str(v))}' for k, v in params.items())}"
+    
+    async def _search_with_browser(self, url: str, query: str, max_results: int) -> List[Lead]:
+        """Load the results page in a pooled browser page."""
+        leads = []
         
-        self.rate_limiter.wait()
+        await self.rate_limiter.await_slot()
         
         try:
-            # Navigate to search page
-            await self.page.goto(url, wait_until='networkidle', timeout=30000)
-            
-            # Wait for results to load
-            await self.page.wait_for_selector('[data-component-type="s-search-result"]', timeout=10000)
-            
-            # Check for CAPTCHA
-            page_content = await self.page.content()
-            if detect_captcha_block(page_content):
-                logger.warning("CAPTCHA detected on Amazon. Skipping.")
-                return leads
-            
-            # Extract sponsored products
-            sponsored_selectors = [
-                '[data-component-type="sp-sponsored-result"]',
-                '[data-component-type="s-search-result"]:has-text("Sponsored")',
-                '.s-result-item:has(.s-label-popover-default:has-text("Sponsored"))'
-            ]
-            
-            for selector in sponsored_selectors:
-                try:
-                    elements = await self.page.query_selector_all(selector)
-                    if elements:
-                        logger.debug(f"Found {len(elements)} sponsored items with selector: {selector}")
-                        break
-                except:
-                    continue
-            else:
-                logger.warning("No sponsored products found")
-                return leads
-            
-            # Parse each sponsored product
-            count = 0
-            for element in elements:
-                if count >= max_results:
-                    break
+            async with self._checkout_page() as page:
+                # Navigate to search page
+                await page.goto(url, wait_until='domcontentloaded', timeout=15000)
                 
-                try:
-                    # Extract product data
-                    product_data = await self._extract_product_data(element)
-                    if product_data:
-                        lead = self._create_lead_from_product(product_data, query)
-                        if lead:
-                            leads.append(lead)
-                            count += 1
-                except Exception as e:
-                    logger.error(f"Error extracting product data: {e}")
-                    continue
-            
-            logger.info(f"Found {len(leads)} sponsored products for query: {query}")
+                # Check for CAPTCHA
+                if await page.locator(CAPTCHA_SELECTOR).count():
+                    logger.warning("CAPTCHA detected on Amazon. Skipping.")
+                    return leads
+                
+                # Wait for results to load
+                await page.wait_for_selector('[data-component-type="s-search-result"]', timeout=10000)
+                
+                # Extract sponsored products, trying the selector that has matched most often first
+                sponsored_selectors = sorted(
+                    SPONSORED_SELECTORS, key=lambda sel: -self._selector_hits[sel]
+                )
+                
+                for selector in sponsored_selectors:
+                    try:
+                        records = await page.eval_on_selector_all(
+                            selector, EXTRACT_PRODUCTS_JS, BRAND_SELECTORS
+                        )
+                        if records:
+                            self._selector_hits[selector] += 1
+                            logger.debug(f"Found {len(records)} sponsored items with selector: {selector}")
+                            break
+                    except:
+                        continue
+                else:
+                    logger.warning("No sponsored products found")
+                    return leads
+                
+                leads = self._leads_from_records(records, query, max_results)
+                logger.info(f"Found {len(leads)} sponsored products for query: {query}")
             
         except Exception as e:
             logger.error(f"Error searching Amazon: {e}")
         
         return leads
     
-    async def _extract_product_data(self, element) -> Optional[Dict[str, Any]]:
-        """Extract data from a product element."""
-        try:
-            data = {}
-            
-            # Get product title
-            title_element = await element.query_selector('h2 a span')
-            if title_element:
-                data['title'] = await title_element.inner_text()
-            
-            # Get brand
-            brand_selectors = [
-                '.s-size-mini.s-spacing-none.s-color-base',
-                '[class*="a-size-base-plus"]',
-                '.a-row.a-size-base.a-color-secondary'
-            ]
-            
-            for selector in brand_selectors:
-                brand_element = await element.query_selector(selector)
-                if brand_element:
-                    brand_text = await brand_element.inner_text()
-                    if brand_text and len(brand_text) < 100:
-                        data['brand'] = brand_text.strip()
-                        break
-            
-            # Get product URL
-            link_element = await element.query_selector('h2 a')
-            if link_element:
-                href = await link_element.get_attribute('href')
-                if href:
-                    data['product_url'] = f"https://www.amazon.com{href}" if href.startswith('/') else href
-            
-            # Get ASIN
-            asin = await element.get_attribute('data-asin')
-            if asin:
-                data['asin'] = asin
-            
-            # Get price
-            price_element = await element.query_selector('.a-price-whole')
-            if price_element:
-                price_text = await price_element.inner_text()
-                data['price'] = price_text.strip()
-            
-            return data if data.get('brand') else None
+    def _leads_from_records(self, records: List[Dict[str, Any]], query: str, max_results: int) -> List[Lead]:
+        """Turn extracted product records into leads, up to max_results."""
+        leads = []
+        for record in records:
+            if len(leads) >= max_results:
+                break
             
-        except Exception as e:
-            logger.error(f"Error extracting product data: {e}")
+            product_data = self._product_data_from_record(record)
+            if product_data:
+                lead = self._create_lead_from_product(product_data, query)
+                if lead:
+                    leads.append(lead)
+        
+        return leads
+    
+    def _product_data_from_record(self, record: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Normalize a record returned by EXTRACT_PRODUCTS_JS."""
+        brand = (record.get('brand') or '').strip()
+        if not brand:
             return None
+        
+        data = {'brand': brand}
+        
+        if record.get('title'):
+            data['title'] = record['title']
+        
+        href = record.get('href')
+        if href:
+            data['product_url'] = f"https://www.amazon.com{href}" if href.startswith('/') else href
+        
+        if record.get('asin'):
+            data['asin'] = record['asin']
+        
+        if record.get('price'):
+            data['price'] = record['price'].strip()
+        
+        return data
     
     def _create_lead_from_product(self, product_data: Dict[str, Any], search_query: str) -> Optional[Lead]:
         """Create a Lead object from product data."""
@@ -211,26 +382,27 @@ class AmazonAdsScraper:
             
             # Clean brand name
             brand = brand.replace('Visit the ', '').replace(' Store', '')
-            brand = clean_company_name(brand)
+            brand = sys.intern(clean_company_name(brand))
             
             # Create pseudo-domain for brand
-            domain = brand.lower().replace(' ', '').replace('.', '') + '.amazon'
+            domain = sys.intern(brand.lower().replace(' ', '').replace('.', '') + '.amazon')
             
             # Create ad creative
-            creative = AdCreative(
+            now = datetime.utcnow()
+            creative = AdCreative.unchecked(
                 ad_id=product_data.get('asin'),
                 advertiser_name=brand,
-                landing_page_url=product_data.get('product_url'),
+                landing_page_url=coerce_http_url(product_data.get('product_url')),
                 source=AdSource.AMAZON_ADS,
-                scraped_at=datetime.utcnow()
+                scraped_at=now
             )
             
             # Create lead
-            lead = Lead(
+            lead = Lead.unchecked(
                 domain=domain,
                 company_name=brand,
-                first_seen=datetime.utcnow(),
-                last_seen=datetime.utcnow(),
+                first_seen=now,
+                last_seen=now,
                 sources=[AdSource.AMAZON_ADS],
                 ad_creatives=[creative]
             )
@@ -245,10 +417,15 @@ class AmazonAdsScraper:
 async def scrape_amazon_ads(
     search_queries: List[str],
     max_results_per_query: int = 20,
-    headless: bool = True
+    headless: bool = True,
+    max_concurrency: int = 3,
+    browser: Optional[Browser] = None,
+    session: Optional[aiohttp.ClientSession] = None
 ) -> List[Lead]:
     """Convenience function to scrape Amazon ads."""
-    async with AmazonAdsScraper(headless=headless) as scraper:
+    async with AmazonAdsScraper(
+        headless=headless, max_concurrency=max_concurrency, browser=browser, session=session
+    ) as scraper:
         return await scraper.search_sponsored_products(
             search_queries=search_queries,
             max_results_per_query=max_results_per_query
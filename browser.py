@@ -0,0 +1,95 @@
+"""Shared Playwright helpers for the browser-based scrapers."""
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Awaitable, Callable, List, Optional
+
+from playwright.async_api import async_playwright, Browser, Page, Playwright
+
+from .utils import setup_logger
+
+logger = setup_logger(__name__)
+
+# One Chromium per event loop, shared by every scraper that asks for it
+_shared_playwright: Optional[Playwright] = None
+_shared_browser: Optional[Browser] = None
+_shared_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+async def get_shared_browser(headless: bool = True) -> Browser:
+    """Launch Chromium on first use and hand the same instance to later callers."""
+    global _shared_playwright, _shared_browser, _shared_loop
+
+    loop = asyncio.get_running_loop()
+    if _shared_browser is not None and _shared_loop is loop and _shared_browser.is_connected():
+        return _shared_browser
+
+    _shared_playwright = await async_playwright().start()
+    _shared_browser = await _shared_playwright.chromium.launch(headless=headless)
+    _shared_loop = loop
+    logger.debug("Launched shared Chromium instance")
+    return _shared_browser
+
+
+async def close_shared_browser() -> None:
+    """Close the shared Chromium instance, if one was launched."""
+    global _shared_playwright, _shared_browser, _shared_loop
+
+    if _shared_browser is not None:
+        await _shared_browser.close()
+    if _shared_playwright is not None:
+        await _shared_playwright.stop()
+    _shared_playwright = _shared_browser = _shared_loop = None
+
+
+class PagePool:
+    """Pool of pre-warmed Playwright pages handed out one at a time."""
+
+    def __init__(
+        self,
+        page_factory: Callable[[], Awaitable[Page]],
+        size: int = 3,
+        page_initiator: Optional[Callable[[Page], Awaitable[None]]] = None
+    ):
+        self.page_factory = page_factory
+        self.size = size
+        self.page_initiator = page_initiator
+        self._pages: List[Page] = []
+        self._queue: asyncio.Queue = asyncio.Queue()
+
+    async def start(self) -> 'PagePool':
+        """Create and initialize all pages up front."""
+        for _ in range(self.size):
+            page = await self.page_factory()
+            if self.page_initiator:
+                await self.page_initiator(page)
+            self._pages.append(page)
+            self._queue.put_nowait(page)
+
+        logger.debug(f"Page pool warmed with {self.size} pages")
+        return self
+
+    async def get(self) -> Page:
+        """Wait for an idle page and take it out of the pool."""
+        return await self._queue.get()
+
+    def put(self, page: Page) -> None:
+        """Return a page to the pool."""
+        self._queue.put_nowait(page)
+
+    @asynccontextmanager
+    async def acquire(self) -> AsyncIterator[Page]:
+        """Borrow a page for the duration of the block."""
+        page = await self.get()
+        try:
+            yield page
+        finally:
+            self.put(page)
+
+    async def close(self) -> None:
+        """Wait for every borrowed page to come back, then close them all."""
+        for _ in range(len(self._pages)):
+            await self._queue.get()
+
+        for page in self._pages:
+            await page.close()
+        self._pages.clear()
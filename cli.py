@@ -1,16 +1,19 @@
 """Command-line interface for the lead scraper."""
 import asyncio
 import os
+from collections import defaultdict
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Optional, List
+from typing import Dict, Optional, List, Tuple
 from enum import Enum
 
+import aiohttp
 import typer
 from rich.console import Console
 from rich.table import Table
 from rich.progress import Progress, SpinnerColumn, TextColumn
 from dotenv import load_dotenv
+from playwright.async_api import Browser
 
 from .models import AdSource, Lead, ScrapeResult
 from .db import LeadDatabase
@@ -19,7 +22,8 @@ from .meta_ads import scrape_meta_ads
 from .amazon_ads import scrape_amazon_ads
 from .shopping_ads import scrape_shopping_ads
 from .enrich import enrich_leads
-from .utils import setup_logger
+from .browser import get_shared_browser, close_shared_browser
+from .utils import setup_logger, get_shared_session, close_shared_session
 
 # Load environment variables
 load_dotenv()
@@ -29,6 +33,10 @@ console = Console()
 logger = setup_logger(__name__)
 
 
+# Sources scraped with Playwright rather than plain HTTP
+BROWSER_SOURCES = {AdSource.AMAZON_ADS, AdSource.SHOPPING_ADS}
+
+
 class SourceChoice(str, Enum):
     """CLI source choices."""
     GOOGLE = "google"
@@ -42,11 +50,8 @@ def parse_date(date_str: str) -> datetime:
     """Parse ISO date string."""
     try:
         return datetime.fromisoformat(date_str)
-    except:
-        try:
-            return datetime.strptime(date_str, "%Y-%m-%d")
-        except:
-            raise typer.BadParameter(f"Invalid date format: {date_str}. Use YYYY-MM-DD")
+    except ValueError:
+        raise typer.BadParameter(f"Invalid date format: {date_str}. Use YYYY-MM-DD")
 
 
 @app.command()
@@ -118,30 +123,135 @@ def scrape(
         }
         sources_to_scrape = [source_map[source]]
     
-    # Run scrapers
-    all_leads = []
-    results = []
-    
+    # One progress display covers scraping, enrichment and saving
     with Progress(
         SpinnerColumn(),
         TextColumn("[progress.description]{task.description}"),
-        console=console
+        console=console,
+        refresh_per_second=8
     ) as progress:
-        for ad_source in sources_to_scrape:
-            task = progress.add_task(f"Scraping {ad_source.value}...", total=None)
+        results, enriched_leads = asyncio.run(_run(
+            sources_to_scrape,
+            progress,
+            query=query,
+            start_date=start_date,
+            max_results=max_leads,
+            headless=headless,
+            enrich=enrich
+        ))
+        
+        # Save to database
+        save_task = progress.add_task("Saving to database...", total=len(enriched_leads))
+        db.upsert_leads(enriched_leads)
+        progress.update(
+            save_task, completed=len(enriched_leads),
+            description=f"✓ Saved {len(enriched_leads)} leads"
+        )
+    
+    # Export to CSV if requested
+    if export_csv and enriched_leads:
+        csv_filename = f"leads_{datetime.utcnow().strftime('%Y-%m-%d')}.csv"
+        db.export_to_csv(csv_filename, enriched_leads)
+        console.print(f"✓ Exported to {csv_filename}")
+    
+    # Display summary
+    display_summary(results, enriched_leads, db)
+    db.close()
+
+
+async def _run(
+    sources: List[AdSource],
+    progress: Progress,
+    query: Optional[str] = None,
+    start_date: Optional[datetime] = None,
+    max_results: int = 100,
+    headless: bool = True,
+    enrich: bool = True
+) -> Tuple[List[ScrapeResult], List[Lead]]:
+    """Scrape, deduplicate and enrich in one event loop; the scrapers share one HTTP session."""
+    session = get_shared_session()
+    try:
+        # Run scrapers
+        all_leads, results = await scrape_sources(
+            sources,
+            progress,
+            query=query,
+            start_date=start_date,
+            max_results=max_results,
+            headless=headless,
+            session=session
+        )
+        
+        # Deduplicate leads
+        console.print(f"\nDeduplicating {len(all_leads)} leads...")
+        unique_leads = deduplicate_leads(all_leads)
+        console.print(f"Found {len(unique_leads)} unique leads")
+        
+        # Enrich leads if requested
+        if not (enrich and unique_leads):
+            return results, unique_leads
+        
+        enrich_task = progress.add_task("Enriching leads...", total=None)
+        
+        def on_progress(done: int, total: int) -> None:
+            progress.update(
+                enrich_task, completed=done, total=total,
+                description=f"Enriching leads... ({done}/{total})"
+            )
+        
+        # The enricher opens its own session: its low per-host limit suits crawling many sites
+        enriched_leads = await enrich_leads(unique_leads, on_progress=on_progress)
+        progress.update(enrich_task, description=f"✓ Enriched {len(enriched_leads)} leads")
+        return results, enriched_leads
+    finally:
+        await close_shared_session()
+
+
+async def scrape_sources(
+    sources: List[AdSource],
+    progress: Progress,
+    query: Optional[str] = None,
+    start_date: Optional[datetime] = None,
+    max_results: int = 100,
+    headless: bool = True,
+    session: Optional[aiohttp.ClientSession] = None
+) -> Tuple[List[Lead], List[ScrapeResult]]:
+    """Run the scrapers for all sources concurrently, reporting each as it finishes."""
+    all_leads: List[Lead] = []
+    results: List[ScrapeResult] = []
+    
+    scrape_task = progress.add_task(f"Scraping {len(sources)} sources...", total=len(sources))
+    
+    # Browser-based scrapers share one Chromium instead of launching their own
+    browser = None
+    if BROWSER_SOURCES.intersection(sources):
+        try:
+            browser = await get_shared_browser(headless=headless)
+        except Exception as e:
+            logger.error(f"Could not launch shared browser: {e}")
+    
+    async def run(ad_source: AdSource):
+        start_time = datetime.utcnow()
+        try:
+            leads = await scrape_source(
+                ad_source,
+                query=query,
+                start_date=start_date,
+                max_results=max_results,
+                headless=headless,
+                browser=browser,
+                session=session
+            )
+            return ad_source, leads, (datetime.utcnow() - start_time).total_seconds(), None
+        except Exception as e:
+            return ad_source, [], 0.0, e
+    
+    try:
+        for next_done in asyncio.as_completed([run(ad_source) for ad_source in sources]):
+            ad_source, leads, duration, error = await next_done
+            progress.advance(scrape_task)
             
-            try:
-                start_time = datetime.utcnow()
-                leads = asyncio.run(scrape_source(
-                    ad_source, 
-                    query=query,
-                    start_date=start_date,
-                    max_results=max_leads,
-                    headless=headless
-                ))
-                
-                duration = (datetime.utcnow() - start_time).total_seconds()
-                
+            if error is None:
                 result = ScrapeResult(
                     source=ad_source,
                     success=True,
@@ -151,49 +261,23 @@ def scrape(
                 results.append(result)
                 all_leads.extend(leads)
                 
-                progress.update(task, description=f"✓ {ad_source.value}: {len(leads)} leads")
-                
-            except Exception as e:
-                logger.error(f"Error scraping {ad_source.value}: {e}")
+                progress.console.print(f"✓ {ad_source.value}: {len(leads)} leads")
+            else:
+                logger.error(f"Error scraping {ad_source.value}: {error}")
                 result = ScrapeResult(
                     source=ad_source,
                     success=False,
-                    errors=[str(e)]
+                    errors=[str(error)]
                 )
                 results.append(result)
-                progress.update(task, description=f"✗ {ad_source.value}: Failed")
-    
-    # Deduplicate leads
-    console.print(f"\nDeduplicating {len(all_leads)} leads...")
-    unique_leads = deduplicate_leads(all_leads)
-    console.print(f"Found {len(unique_leads)} unique leads")
-    
-    # Enrich leads if requested
-    if enrich and unique_leads:
-        with Progress(
-            SpinnerColumn(),
-            TextColumn("[progress.description]{task.description}"),
-            console=console
-        ) as progress:
-            task = progress.add_task("Enriching leads...", total=None)
-            enriched_leads = asyncio.run(enrich_leads(unique_leads))
-            progress.update(task, description=f"✓ Enriched {len(enriched_leads)} leads")
-    else:
-        enriched_leads = unique_leads
+                progress.console.print(f"✗ {ad_source.value}: Failed")
+    finally:
+        if browser:
+            await close_shared_browser()
     
-    # Save to database
-    console.print("\nSaving to database...")
-    for lead in enriched_leads:
-        db.upsert_lead(lead)
-    
-    # Export to CSV if requested
-    if export_csv and enriched_leads:
-        csv_filename = f"leads_{datetime.utcnow().strftime('%Y-%m-%d')}.csv"
-        db.export_to_csv(csv_filename, enriched_leads)
-        console.print(f"✓ Exported to {csv_filename}")
+    progress.update(scrape_task, description=f"✓ Scraped {len(sources)} sources")
     
-    # Display summary
-    display_summary(results, enriched_leads, db)
+    return all_leads, results
 
 
 async def scrape_source(
@@ -201,20 +285,24 @@ async def scrape_source(
     query: Optional[str] = None,
     start_date: Optional[datetime] = None,
     max_results: int = 100,
-    headless: bool = True
+    headless: bool = True,
+    browser: Optional[Browser] = None,
+    session: Optional[aiohttp.ClientSession] = None
 ) -> List[Lead]:
     """Scrape a single source."""
     if source == AdSource.GOOGLE_ADS:
         return await scrape_google_ads(
             query=query or "",
             start_date=start_date,
-            max_results=max_results
+            max_results=max_results,
+            session=session
         )
     
     elif source == AdSource.META_ADS:
         return await scrape_meta_ads(
             search_terms=query or "",
-            limit=max_results
+            limit=max_results,
+            session=session
         )
     
     elif source == AdSource.AMAZON_ADS:
@@ -226,7 +314,9 @@ async def scrape_source(
         return await scrape_amazon_ads(
             search_queries=queries,
             max_results_per_query=max_results // len(queries),
-            headless=headless
+            headless=headless,
+            browser=browser,
+            session=session
         )
     
     elif source == AdSource.SHOPPING_ADS:
@@ -238,7 +328,8 @@ async def scrape_source(
         return await scrape_shopping_ads(
             search_queries=queries,
             max_results_per_query=max_results // len(queries),
-            headless=headless
+            headless=headless,
+            browser=browser
         )
     
     return []
@@ -246,16 +337,17 @@ async def scrape_source(
 
 def deduplicate_leads(leads: List[Lead]) -> List[Lead]:
     """Deduplicate leads by domain."""
-    unique_leads = {}
-    
+    buckets: Dict[str, List[Lead]] = defaultdict(list)
     for lead in leads:
-        if lead.domain in unique_leads:
-            # Merge with existing lead
-            unique_leads[lead.domain].merge_with(lead)
-        else:
-            unique_leads[lead.domain] = lead
+        buckets[lead.domain].append(lead)
+    
+    # Fold each domain's duplicates into its first lead in one pass
+    unique_leads = []
+    for first, *duplicates in buckets.values():
+        first.merge_many(duplicates)
+        unique_leads.append(first)
     
-    return list(unique_leads.values())
+    return unique_leads
 
 
 def display_summary(results: List[ScrapeResult], leads: List[Lead], db: LeadDatabase):
@@ -317,6 +409,7 @@ def stats(
     """Display database statistics."""
     db = LeadDatabase(db_path)
     stats = db.get_stats()
+    db.close()
     
     console.print("[bold]Lead Database Statistics[/bold]\n")
     console.print(f"Total leads: {stats['total_leads']}")
@@ -338,14 +431,15 @@ def export(
 ):
     """Export leads to CSV."""
     db = LeadDatabase(db_path)
-    leads = db.get_all_leads(active_only=active_only, limit=limit)
+    count = db.export_to_csv(output, active_only=active_only, limit=limit)
+    db.close()
     
-    if not leads:
+    if not count:
+        Path(output).unlink(missing_ok=True)
         console.print("[yellow]No leads found to export[/yellow]")
         return
     
-    db.export_to_csv(output, leads)
-    console.print(f"[green]✓ Exported {len(leads)} leads to {output}[/green]")
+    console.print(f"[green]✓ Exported {count} leads to {output}[/green]")
 
 
 def main():
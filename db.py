@@ -1,46 +1,169 @@
 """Database operations for lead storage and retrieval."""
+import calendar
+import contextlib
 import sqlite3
-from typing import List, Optional, Dict, Any
+import threading
+from collections import defaultdict
+from typing import Iterator, List, Optional, Dict, Any
 from datetime import datetime
-import json
 from pathlib import Path
 
 from .models import Lead, AdCreative, CompanyInfo, AdSource
-from .utils import setup_logger
+from .utils import json_dumps, loads_json, setup_logger
 
 logger = setup_logger(__name__)
 
+# Stay below SQLite's default limit on bound parameters per statement
+SQLITE_MAX_VARIABLES = 900
+
+# Column order of CSV exports
+EXPORT_FIELDNAMES = [
+    'domain', 'company_name', 'first_seen', 'last_seen',
+    'sources', 'total_impressions', 'total_spend_estimate',
+    'website_title', 'linkedin_url', 'phone', 'email',
+    'company_size', 'industry', 'num_creatives', 'is_active'
+]
+
+# CompanyInfo fields stored as their own columns on the leads table
+COMPANY_INFO_FIELDS = (
+    'website_title', 'linkedin_url', 'phone', 'email', 'company_size', 'industry'
+)
+
+# Rows fetched per round trip when streaming exports
+EXPORT_BATCH_SIZE = 1000
+
+# PRAGMA user_version once epoch timestamps are in place; older files are migrated on open
+SCHEMA_VERSION = 1
+
+# Statements reused on every call, kept as constants so sqlite3's statement cache hits them
+_SQL_SELECT_LEAD_BY_DOMAIN = 'SELECT * FROM leads WHERE domain = ?'
+
+_SQL_SELECT_CREATIVES = 'SELECT * FROM ad_creatives WHERE lead_id = ?'
+
+_SQL_INSERT_LEAD = f'''
+    INSERT INTO leads (
+        domain, company_name, first_seen, last_seen, sources,
+        total_impressions, total_spend_estimate, is_active,
+        {', '.join(COMPANY_INFO_FIELDS)}
+    ) VALUES ({', '.join('?' * (8 + len(COMPANY_INFO_FIELDS)))})
+'''
+
+_SQL_UPSERT_LEAD = _SQL_INSERT_LEAD + f'''
+    ON CONFLICT(domain) DO UPDATE SET
+        company_name = excluded.company_name,
+        last_seen = excluded.last_seen,
+        sources = excluded.sources,
+        total_impressions = excluded.total_impressions,
+        total_spend_estimate = excluded.total_spend_estimate,
+        is_active = excluded.is_active,
+        {', '.join(f'{field} = excluded.{field}' for field in COMPANY_INFO_FIELDS)},
+        updated_at = CURRENT_TIMESTAMP
+'''
+
+_SQL_UPSERT_LEAD_RETURNING_ID = _SQL_UPSERT_LEAD + 'RETURNING id'
+
+_SQL_INSERT_CREATIVE = '''
+    INSERT OR IGNORE INTO ad_creatives (
+        lead_id, ad_id, advertiser_name, creative_url,
+        campaign_start_date, impressions, spend_estimate,
+        landing_page_url, source, scraped_at
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+_SQL_INSERT_LEAD_SOURCE = 'INSERT OR IGNORE INTO lead_sources (lead_id, source) VALUES (?, ?)'
+_SQL_DELETE_LEAD_SOURCES = 'DELETE FROM lead_sources WHERE lead_id = ?'
+
+_SQL_STATS = '''
+    SELECT COUNT(*),
+           COALESCE(SUM(is_active = 1), 0),
+           (SELECT COUNT(*) FROM ad_creatives)
+    FROM leads
+'''
+
+_SQL_LEADS_BY_SOURCE = 'SELECT source, COUNT(*) FROM lead_sources GROUP BY source'
+
+
+def _to_epoch(value: datetime) -> int:
+    """Convert a naive UTC datetime to Unix epoch seconds."""
+    return calendar.timegm(value.utctimetuple())
+
+
+def _company_info_values(info: Optional[CompanyInfo]) -> tuple:
+    """Column values for a lead's company info, in COMPANY_INFO_FIELDS order."""
+    if info is None:
+        return (None,) * len(COMPANY_INFO_FIELDS)
+    return tuple(
+        None if value is None else str(value)
+        for value in (getattr(info, field) for field in COMPANY_INFO_FIELDS)
+    )
+
+
+def _row_to_company_info(row: sqlite3.Row) -> Optional[CompanyInfo]:
+    """Rebuild CompanyInfo from the flattened columns, or None if they are all empty."""
+    values = {field: row[field] for field in COMPANY_INFO_FIELDS}
+    if not any(values.values()):
+        return None
+    return CompanyInfo.unchecked(**values)
+
 
 class LeadDatabase:
     """Handle SQLite database operations for leads."""
     
     def __init__(self, db_path: str = "leads.db"):
         self.db_path = db_path
+        self._lock = threading.RLock()
+        self._conn = self._connect()
         self._init_db()
     
+    def _connect(self) -> sqlite3.Connection:
+        """Open a connection with the per-connection performance PRAGMAs applied."""
+        conn = sqlite3.connect(self.db_path, check_same_thread=False, cached_statements=256)
+        conn.row_factory = sqlite3.Row
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute('PRAGMA temp_store=MEMORY')
+        conn.execute('PRAGMA mmap_size=268435456')
+        conn.execute('PRAGMA cache_size=-65536')
+        conn.execute('PRAGMA foreign_keys=ON')
+        return conn
+    
+    def close(self) -> None:
+        """Close the underlying connection."""
+        with self._lock:
+            self._conn.close()
+    
     def _init_db(self) -> None:
         """Initialize database with required tables."""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._lock, self._conn as conn:
             cursor = conn.cursor()
             
+            # WAL is persistent, so it only needs to be set once per database file
+            cursor.execute('PRAGMA journal_mode=WAL')
+            
             # Create leads table
             cursor.execute('''
                 CREATE TABLE IF NOT EXISTS leads (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
                     domain TEXT UNIQUE NOT NULL,
                     company_name TEXT NOT NULL,
-                    first_seen TIMESTAMP NOT NULL,
-                    last_seen TIMESTAMP NOT NULL,
+                    first_seen INTEGER NOT NULL,  -- Unix epoch seconds (UTC)
+                    last_seen INTEGER NOT NULL,  -- Unix epoch seconds (UTC)
                     sources TEXT NOT NULL,  -- JSON array
                     total_impressions INTEGER,
                     total_spend_estimate REAL,
                     is_active BOOLEAN DEFAULT 1,
-                    company_info TEXT,  -- JSON object
+                    website_title TEXT,
+                    linkedin_url TEXT,
+                    phone TEXT,
+                    email TEXT,
+                    company_size TEXT,
+                    industry TEXT,
                     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
                 )
             ''')
             
+            self._migrate_company_info(cursor)
+            
             # Create ad_creatives table
             cursor.execute('''
                 CREATE TABLE IF NOT EXISTS ad_creatives (
@@ -61,153 +184,217 @@ class LeadDatabase:
                 )
             ''')
             
+            # Create lead_sources table (one row per lead and source)
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS lead_sources (
+                    lead_id INTEGER NOT NULL,
+                    source TEXT NOT NULL,
+                    FOREIGN KEY (lead_id) REFERENCES leads (id),
+                    PRIMARY KEY (lead_id, source)
+                )
+            ''')
+            
+            # Backfill lead_sources from the JSON column for databases created before it existed
+            cursor.execute('SELECT 1 FROM lead_sources LIMIT 1')
+            if not cursor.fetchone():
+                cursor.execute('''
+                    INSERT OR IGNORE INTO lead_sources (lead_id, source)
+                    SELECT leads.id, json_each.value FROM leads, json_each(leads.sources)
+                ''')
+            
+            # Convert ISO-8601 timestamps written by older versions to epoch seconds, once per file
+            cursor.execute('PRAGMA user_version')
+            if cursor.fetchone()[0] < SCHEMA_VERSION:
+                cursor.execute('''
+                    UPDATE leads
+                    SET first_seen = CAST(strftime('%s', first_seen) AS INTEGER),
+                        last_seen = CAST(strftime('%s', last_seen) AS INTEGER)
+                    WHERE typeof(first_seen) = 'text' OR typeof(last_seen) = 'text'
+                ''')
+                cursor.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+            
             # Create indexes
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_leads_domain ON leads (domain)')
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_leads_active ON leads (is_active)')
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_creatives_lead ON ad_creatives (lead_id)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_lead_sources_source ON lead_sources (source)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_leads_last_seen ON leads (last_seen DESC)')
+            cursor.execute(
+                'CREATE INDEX IF NOT EXISTS idx_leads_active_lastseen ON leads (is_active, last_seen DESC)'
+            )
+            
+            # (lead_id, source) also serves plain lead_id lookups, so it replaces the old single-column index
+            cursor.execute('DROP INDEX IF EXISTS idx_creatives_lead')
+            cursor.execute(
+                'CREATE INDEX IF NOT EXISTS idx_creatives_lead_source ON ad_creatives (lead_id, source)'
+            )
             
             conn.commit()
+            
+            # Refresh planner statistics when they are missing or stale
+            cursor.execute('PRAGMA optimize')
             logger.info(f"Database initialized at {self.db_path}")
     
+    def _migrate_company_info(self, cursor: sqlite3.Cursor) -> None:
+        """Add the flattened company info columns to older databases and backfill them from JSON."""
+        cursor.execute('PRAGMA table_info(leads)')
+        columns = {row['name'] for row in cursor.fetchall()}
+        missing = [field for field in COMPANY_INFO_FIELDS if field not in columns]
+        if not missing:
+            return
+        
+        for field in missing:
+            cursor.execute(f'ALTER TABLE leads ADD COLUMN {field} TEXT')
+        
+        if 'company_info' in columns:
+            assignments = ', '.join(
+                f"{field} = json_extract(company_info, '$.{field}')" for field in missing
+            )
+            cursor.execute(f'UPDATE leads SET {assignments} WHERE company_info IS NOT NULL')
+        
+        logger.info(f"Migrated company info into columns: {', '.join(missing)}")
+    
     def upsert_lead(self, lead: Lead) -> int:
         """Insert or update a lead record. Returns lead ID."""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._lock, self._conn as conn:
             cursor = conn.cursor()
             
-            # Check if lead exists
-            cursor.execute('SELECT id FROM leads WHERE domain = ?', (lead.domain,))
-            existing = cursor.fetchone()
+            cursor.execute(_SQL_UPSERT_LEAD_RETURNING_ID, self._lead_row(lead))
+            lead_id = cursor.fetchone()[0]
+            logger.debug(f"Upserted lead {lead.domain} (ID: {lead_id})")
             
-            if existing:
-                lead_id = existing[0]
-                # Update existing lead
-                cursor.execute('''
-                    UPDATE leads 
-                    SET company_name = ?,
-                        last_seen = ?,
-                        sources = ?,
-                        total_impressions = ?,
-                        total_spend_estimate = ?,
-                        is_active = ?,
-                        company_info = ?,
-                        updated_at = CURRENT_TIMESTAMP
-                    WHERE id = ?
-                ''', (
-                    lead.company_name,
-                    lead.last_seen.isoformat(),
-                    json.dumps([s.value for s in lead.sources]),
-                    lead.total_impressions,
-                    lead.total_spend_estimate,
-                    lead.is_active,
-                    json.dumps(lead.company_info.dict()) if lead.company_info else None,
-                    lead_id
-                ))
-                logger.debug(f"Updated lead {lead.domain} (ID: {lead_id})")
-            else:
-                # Insert new lead
-                cursor.execute('''
-                    INSERT INTO leads (
-                        domain, company_name, first_seen, last_seen, sources,
-                        total_impressions, total_spend_estimate, is_active, company_info
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    lead.domain,
-                    lead.company_name,
-                    lead.first_seen.isoformat(),
-                    lead.last_seen.isoformat(),
-                    json.dumps([s.value for s in lead.sources]),
-                    lead.total_impressions,
-                    lead.total_spend_estimate,
-                    lead.is_active,
-                    json.dumps(lead.company_info.dict()) if lead.company_info else None
-                ))
-                lead_id = cursor.lastrowid
-                logger.debug(f"Inserted new lead {lead.domain} (ID: {lead_id})")
-            
-            # Insert ad creatives
-            for creative in lead.ad_creatives:
-                self._insert_creative(cursor, lead_id, creative)
+            # The upsert replaces the JSON sources column, so replace the rows that mirror it too
+            cursor.execute(_SQL_DELETE_LEAD_SOURCES, (lead_id,))
+            cursor.executemany(
+                _SQL_INSERT_LEAD_SOURCE,
+                [(lead_id, s.value) for s in lead.sources]
+            )
+            
+            # Insert ad creatives; OR IGNORE skips ones already stored
+            cursor.executemany(
+                _SQL_INSERT_CREATIVE,
+                [self._creative_row(lead_id, creative) for creative in lead.ad_creatives]
+            )
             
             conn.commit()
             return lead_id
     
-    def _insert_creative(self, cursor: sqlite3.Cursor, lead_id: int, creative: AdCreative) -> None:
-        """Insert an ad creative if it doesn't exist."""
-        try:
-            cursor.execute('''
-                INSERT OR IGNORE INTO ad_creatives (
-                    lead_id, ad_id, advertiser_name, creative_url,
-                    campaign_start_date, impressions, spend_estimate,
-                    landing_page_url, source, scraped_at
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                lead_id,
-                creative.ad_id,
-                creative.advertiser_name,
-                str(creative.creative_url) if creative.creative_url else None,
-                creative.campaign_start_date.isoformat() if creative.campaign_start_date else None,
-                creative.impressions,
-                creative.spend_estimate,
-                str(creative.landing_page_url) if creative.landing_page_url else None,
-                creative.source.value,
-                creative.scraped_at.isoformat()
-            ))
-        except sqlite3.IntegrityError:
-            # Creative already exists
-            pass
+    def upsert_leads(self, leads: List[Lead]) -> Dict[str, int]:
+        """Insert or update many leads in a single transaction. Returns lead IDs by domain."""
+        if not leads:
+            return {}
+        
+        with self._lock, self._conn as conn:
+            cursor = conn.cursor()
+            
+            cursor.executemany(_SQL_UPSERT_LEAD, [self._lead_row(lead) for lead in leads])
+            
+            # Look up the IDs of the rows just written so creatives can be linked
+            domains = list({lead.domain for lead in leads})
+            lead_ids: Dict[str, int] = {}
+            for start in range(0, len(domains), SQLITE_MAX_VARIABLES):
+                chunk = domains[start:start + SQLITE_MAX_VARIABLES]
+                placeholders = ', '.join('?' * len(chunk))
+                cursor.execute(f'SELECT id, domain FROM leads WHERE domain IN ({placeholders})', chunk)
+                lead_ids.update((domain, lead_id) for lead_id, domain in cursor.fetchall())
+            
+            cursor.executemany(_SQL_INSERT_CREATIVE, [
+                self._creative_row(lead_ids[lead.domain], creative)
+                for lead in leads
+                for creative in lead.ad_creatives
+            ])
+            
+            # The upsert replaces the JSON sources column, so replace the rows that mirror it too;
+            # when a domain repeats, the last lead's sources are the ones stored
+            latest = {lead.domain: lead for lead in leads}
+            cursor.executemany(_SQL_DELETE_LEAD_SOURCES, [(lead_ids[domain],) for domain in latest])
+            cursor.executemany(
+                _SQL_INSERT_LEAD_SOURCE,
+                [(lead_ids[domain], s.value) for domain, lead in latest.items() for s in lead.sources]
+            )
+            
+            conn.commit()
+            logger.debug(f"Upserted {len(leads)} leads")
+            return lead_ids
+    
+    @staticmethod
+    def _lead_row(lead: Lead) -> tuple:
+        """Build the INSERT parameters for a lead."""
+        return (
+            lead.domain,
+            lead.company_name,
+            _to_epoch(lead.first_seen),
+            _to_epoch(lead.last_seen),
+            json_dumps([s.value for s in lead.sources]),
+            lead.total_impressions,
+            lead.total_spend_estimate,
+            lead.is_active,
+            *_company_info_values(lead.company_info)
+        )
+    
+    @staticmethod
+    def _creative_row(lead_id: int, creative: AdCreative) -> tuple:
+        """Build the INSERT parameters for an ad creative."""
+        return (
+            lead_id,
+            creative.ad_id,
+            creative.advertiser_name,
+            creative.creative_url or None,
+            creative.campaign_start_date.isoformat() if creative.campaign_start_date else None,
+            creative.impressions,
+            creative.spend_estimate,
+            creative.landing_page_url or None,
+            creative.source.value,
+            creative.scraped_at.isoformat()
+        )
     
     def get_lead_by_domain(self, domain: str) -> Optional[Lead]:
         """Retrieve a lead by domain."""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
+        with self._lock, self._conn as conn:
             cursor = conn.cursor()
             
-            cursor.execute('SELECT * FROM leads WHERE domain = ?', (domain,))
+            cursor.execute(_SQL_SELECT_LEAD_BY_DOMAIN, (domain,))
             row = cursor.fetchone()
             
             if not row:
                 return None
             
             # Get ad creatives
-            cursor.execute(
-                'SELECT * FROM ad_creatives WHERE lead_id = ?',
-                (row['id'],)
-            )
+            cursor.execute(_SQL_SELECT_CREATIVES, (row['id'],))
             creative_rows = cursor.fetchall()
             
-            # Reconstruct lead object
-            lead = Lead(
-                domain=row['domain'],
-                company_name=row['company_name'],
-                first_seen=datetime.fromisoformat(row['first_seen']),
-                last_seen=datetime.fromisoformat(row['last_seen']),
-                sources=[AdSource(s) for s in json.loads(row['sources'])],
-                total_impressions=row['total_impressions'],
-                total_spend_estimate=row['total_spend_estimate'],
-                is_active=bool(row['is_active'])
+            return self._row_to_lead(row, creative_rows)
+    
+    def _row_to_lead(self, row: sqlite3.Row, creative_rows: List[sqlite3.Row]) -> Lead:
+        """Rebuild a Lead from its leads row and its ad_creatives rows."""
+        # Rows were validated when they were written, so skip pydantic validation on the way out
+        creatives = [
+            AdCreative.unchecked(
+                ad_id=creative_row['ad_id'],
+                advertiser_name=creative_row['advertiser_name'],
+                creative_url=creative_row['creative_url'],
+                campaign_start_date=datetime.fromisoformat(creative_row['campaign_start_date']) 
+                    if creative_row['campaign_start_date'] else None,
+                impressions=creative_row['impressions'],
+                spend_estimate=creative_row['spend_estimate'],
+                landing_page_url=creative_row['landing_page_url'],
+                source=AdSource(creative_row['source']),
+                scraped_at=datetime.fromisoformat(creative_row['scraped_at'])
             )
-            
-            # Add company info if available
-            if row['company_info']:
-                lead.company_info = CompanyInfo(**json.loads(row['company_info']))
-            
-            # Add ad creatives
-            for creative_row in creative_rows:
-                creative = AdCreative(
-                    ad_id=creative_row['ad_id'],
-                    advertiser_name=creative_row['advertiser_name'],
-                    creative_url=creative_row['creative_url'],
-                    campaign_start_date=datetime.fromisoformat(creative_row['campaign_start_date']) 
-                        if creative_row['campaign_start_date'] else None,
-                    impressions=creative_row['impressions'],
-                    spend_estimate=creative_row['spend_estimate'],
-                    landing_page_url=creative_row['landing_page_url'],
-                    source=AdSource(creative_row['source']),
-                    scraped_at=datetime.fromisoformat(creative_row['scraped_at'])
-                )
-                lead.ad_creatives.append(creative)
-            
-            return lead
+            for creative_row in creative_rows
+        ]
+        
+        return Lead.unchecked(
+            domain=row['domain'],
+            company_name=row['company_name'],
+            first_seen=datetime.utcfromtimestamp(row['first_seen']),
+            last_seen=datetime.utcfromtimestamp(row['last_seen']),
+            sources=[AdSource(s) for s in loads_json(row['sources'])],
+            ad_creatives=creatives,
+            company_info=_row_to_company_info(row),
+            total_impressions=row['total_impressions'],
+            total_spend_estimate=row['total_spend_estimate'],
+            is_active=bool(row['is_active'])
+        )
     
     def get_all_leads(
         self,
@@ -216,8 +403,7 @@ class LeadDatabase:
         limit: Optional[int] = None
     ) -> List[Lead]:
         """Retrieve all leads matching criteria."""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
+        with self._lock, self._conn as conn:
             cursor = conn.cursor()
             
             query = 'SELECT * FROM leads WHERE 1=1'
@@ -228,7 +414,7 @@ class LeadDatabase:
             
             if since:
                 query += ' AND last_seen >= ?'
-                params.append(since.isoformat())
+                params.append(_to_epoch(since))
             
             query += ' ORDER BY last_seen DESC'
             
@@ -239,90 +425,131 @@ class LeadDatabase:
             cursor.execute(query, params)
             rows = cursor.fetchall()
             
-            leads = []
-            for row in rows:
-                lead = self.get_lead_by_domain(row['domain'])
-                if lead:
-                    leads.append(lead)
+            # Fetch creatives for all matched leads at once, chunked to stay under SQLite's variable limit
+            ids = [row['id'] for row in rows]
+            creatives_by_lead: Dict[int, List[sqlite3.Row]] = defaultdict(list)
+            for start in range(0, len(ids), SQLITE_MAX_VARIABLES):
+                chunk = ids[start:start + SQLITE_MAX_VARIABLES]
+                placeholders = ', '.join('?' * len(chunk))
+                cursor.execute(f'SELECT * FROM ad_creatives WHERE lead_id IN ({placeholders})', chunk)
+                for creative_row in cursor.fetchall():
+                    creatives_by_lead[creative_row['lead_id']].append(creative_row)
             
-            return leads
+            return [self._row_to_lead(row, creatives_by_lead[row['id']]) for row in rows]
     
-    def export_to_csv(self, output_path: str, leads: Optional[List[Lead]] = None) -> None:
-        """Export leads to CSV file."""
-        import csv
+    def iter_leads_for_export(
+        self,
+        active_only: bool = True,
+        limit: Optional[int] = None
+    ) -> Iterator[List[tuple]]:
+        """Stream batches of CSV-ready rows straight from the database, in EXPORT_FIELDNAMES order."""
+        # Format every column in SQL so batches can go to csv.writer untouched
+        query = '''
+            SELECT domain, company_name,
+                   strftime('%Y-%m-%dT%H:%M:%S', first_seen, 'unixepoch'),
+                   strftime('%Y-%m-%dT%H:%M:%S', last_seen, 'unixepoch'),
+                   (SELECT group_concat(value, ', ') FROM json_each(leads.sources)),
+                   total_impressions, total_spend_estimate,
+                   website_title, linkedin_url, phone, email, company_size, industry,
+                   (SELECT COUNT(*) FROM ad_creatives WHERE lead_id = leads.id),
+                   CASE WHEN is_active THEN 'True' ELSE 'False' END
+            FROM leads WHERE 1=1
+        '''
+        params: List[Any] = []
         
-        if leads is None:
-            leads = self.get_all_leads()
+        if active_only:
+            query += ' AND is_active = 1'
         
-        fieldnames = [
-            'domain', 'company_name', 'first_seen', 'last_seen',
-            'sources', 'total_impressions', 'total_spend_estimate',
-            'website_title', 'linkedin_url', 'phone', 'email',
-            'company_size', 'industry', 'num_creatives', 'is_active'
-        ]
+        query += ' ORDER BY last_seen DESC'
         
+        if limit:
+            query += ' LIMIT ?'
+            params.append(limit)
+        
+        with self._lock:
+            # Dedicated read cursor; no transaction is opened for a plain SELECT
+            cursor = self._conn.cursor()
+            cursor.row_factory = None
+            cursor.arraysize = EXPORT_BATCH_SIZE
+            cursor.execute(query, params)
+        
+        # Hold the lock per batch, never across a yield, so a slow or abandoned consumer can't block writers
+        try:
+            while True:
+                with self._lock:
+                    rows = cursor.fetchmany()
+                if not rows:
+                    break
+                yield rows
+        finally:
+            # Runs on exhaustion or close(), so an abandoned export doesn't pin its read snapshot
+            with self._lock:
+                cursor.close()
+    
+    @staticmethod
+    def _export_row(lead: Lead) -> tuple:
+        """Build a CSV row for an in-memory lead, in EXPORT_FIELDNAMES order."""
+        info = lead.company_info
+        return (
+            lead.domain,
+            lead.company_name,
+            lead.first_seen.isoformat(timespec='seconds'),
+            lead.last_seen.isoformat(timespec='seconds'),
+            ', '.join(s.value for s in lead.sources),
+            lead.total_impressions,
+            lead.total_spend_estimate,
+            info.website_title if info else None,
+            str(info.linkedin_url) if info and info.linkedin_url else None,
+            info.phone if info else None,
+            info.email if info else None,
+            info.company_size if info else None,
+            info.industry if info else None,
+            len(lead.ad_creatives),
+            lead.is_active
+        )
+    
+    def export_to_csv(
+        self,
+        output_path: str,
+        leads: Optional[List[Lead]] = None,
+        active_only: bool = True,
+        limit: Optional[int] = None
+    ) -> int:
+        """Export leads to CSV file. Streams from the database unless leads are given. Returns row count."""
+        import csv
+        
+        count = 0
         with open(output_path, 'w', newline='', encoding='utf-8') as csvfile:
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-            writer.writeheader()
-            
-            for lead in leads:
-                row = {
-                    'domain': lead.domain,
-                    'company_name': lead.company_name,
-                    'first_seen': lead.first_seen.isoformat(),
-                    'last_seen': lead.last_seen.isoformat(),
-                    'sources': ', '.join(s.value for s in lead.sources),
-                    'total_impressions': lead.total_impressions,
-                    'total_spend_estimate': lead.total_spend_estimate,
-                    'num_creatives': len(lead.ad_creatives),
-                    'is_active': lead.is_active
-                }
-                
-                # Add company info fields
-                if lead.company_info:
-                    row.update({
-                        'website_title': lead.company_info.website_title,
-                        'linkedin_url': str(lead.company_info.linkedin_url) if lead.company_info.linkedin_url else None,
-                        'phone': lead.company_info.phone,
-                        'email': lead.company_info.email,
-                        'company_size': lead.company_info.company_size,
-                        'industry': lead.company_info.industry
-                    })
-                
-                writer.writerow(row)
+            writer = csv.writer(csvfile)
+            writer.writerow(EXPORT_FIELDNAMES)
+            
+            if leads is None:
+                batches = self.iter_leads_for_export(active_only=active_only, limit=limit)
+                with contextlib.closing(batches):
+                    for batch in batches:
+                        writer.writerows(batch)
+                        count += len(batch)
+            else:
+                writer.writerows(map(self._export_row, leads))
+                count = len(leads)
         
-        logger.info(f"Exported {len(leads)} leads to {output_path}")
+        logger.info(f"Exported {count} leads to {output_path}")
+        return count
     
     def get_stats(self) -> Dict[str, Any]:
         """Get database statistics."""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._lock, self._conn as conn:
             cursor = conn.cursor()
             
             stats = {}
             
-            # Total leads
-            cursor.execute('SELECT COUNT(*) FROM leads')
-            stats['total_leads'] = cursor.fetchone()[0]
-            
-            # Active leads
-            cursor.execute('SELECT COUNT(*) FROM leads WHERE is_active = 1')
-            stats['active_leads'] = cursor.fetchone()[0]
-            
-            # Total ad creatives
-            cursor.execute('SELECT COUNT(*) FROM ad_creatives')
-            stats['total_creatives'] = cursor.fetchone()[0]
+            # Lead and creative totals in one statement
+            cursor.execute(_SQL_STATS)
+            stats['total_leads'], stats['active_leads'], stats['total_creatives'] = cursor.fetchone()
             
             # Leads by source
-            cursor.execute('''
-                SELECT sources, COUNT(*) as count 
-                FROM leads 
-                GROUP BY sources
-            ''')
-            source_counts = {}
-            for row in cursor.fetchall():
-                sources = json.loads(row[0])
-                for source in sources:
-                    source_counts[source] = source_counts.get(source, 0) + row[1]
+            cursor.execute(_SQL_LEADS_BY_SOURCE)
+            source_counts = dict(cursor.fetchall())
             stats['leads_by_source'] = source_counts
             
             return stats
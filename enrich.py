@@ -2,21 +2,94 @@
 import asyncio
 import os
 import re
-from typing import Optional, Dict, Any, List
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Optional, Dict, Any, List, Union
 from urllib.parse import urljoin
 
 import aiohttp
 from bs4 import BeautifulSoup
 
-from .models import CompanyInfo, Lead
+from .models import CompanyInfo, Lead, model_fields_set
 from .utils import (
-    RateLimiter, retry_on_exception, setup_logger,
+    RateLimiter, TokenBucketRateLimiter, retry_on_exception, setup_logger,
     get_random_user_agent, extract_email_from_text,
-    extract_phone_from_text, normalize_url
+    extract_phone_from_text, normalize_url, loads_json, with_backoff,
+    HTML_PARSER
 )
 
 logger = setup_logger(__name__)
 
+# Selectors and patterns used by CompanyEnricher._parse_website_data, built once per process
+LINKEDIN_LINK_SELECTOR = 'a[href*="linkedin.com/company/"], a[href*="linkedin.com/in/"]'
+CONTACT_SECTION_SELECTOR = (
+    ':is(div, section, footer)[class*="contact" i], '
+    ':is(div, section, footer)[class*="footer" i]'
+)
+_SIZE_RES = [
+    (re.compile(r'(\d+)\+?\s*employees', re.I), lambda m: f"{m.group(1)}+ employees"),
+    (re.compile(r'team of (\d+)', re.I), lambda m: f"~{m.group(1)} employees"),
+    (re.compile(r'(\d+)-(\d+)\s*employees', re.I), lambda m: f"{m.group(1)}-{m.group(2)} employees")
+]
+
+
+class EnrichmentCache:
+    """SQLite-backed cache of raw enrichment responses keyed by domain."""
+    
+    def __init__(self, cache_dir: str = ".cache", ttl: float = 86400):
+        self.ttl = ttl
+        Path(cache_dir).mkdir(parents=True, exist_ok=True)
+        self.db_path = str(Path(cache_dir) / "enrich.db")
+        
+        # One connection for the cache's lifetime; calls arrive from worker threads
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS responses (
+                namespace TEXT NOT NULL,
+                domain TEXT NOT NULL,
+                value BLOB NOT NULL,
+                expires_at REAL NOT NULL,
+                PRIMARY KEY (namespace, domain)
+            )
+        ''')
+        # Expired rows are never read again, so drop them on open
+        self._conn.execute('DELETE FROM responses WHERE expires_at <= ?', (time.time(),))
+    
+    def get(self, namespace: str, domain: str) -> Optional[bytes]:
+        """Return the cached value, or None if missing or expired."""
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT value FROM responses WHERE namespace = ? AND domain = ? AND expires_at > ?',
+                (namespace, domain, time.time())
+            ).fetchone()
+        return row[0] if row else None
+    
+    def set(self, namespace: str, domain: str, value: bytes) -> None:
+        """Store a value for the configured TTL."""
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO responses (namespace, domain, value, expires_at) VALUES (?, ?, ?, ?)',
+                (namespace, domain, value, time.time() + self.ttl)
+            )
+    
+    async def aget(self, namespace: str, domain: str) -> Optional[bytes]:
+        """get() run in a worker thread so the event loop keeps serving other requests."""
+        return await asyncio.to_thread(self.get, namespace, domain)
+    
+    async def aset(self, namespace: str, domain: str, value: bytes) -> None:
+        """set() run in a worker thread so the event loop keeps serving other requests."""
+        await asyncio.to_thread(self.set, namespace, domain, value)
+    
+    def close(self) -> None:
+        """Close the underlying connection."""
+        with self._lock:
+            self._conn.close()
+
 
 class CompanyEnricher:
     """Enrich leads with company information from their websites."""
@@ -24,41 +97,76 @@ class CompanyEnricher:
     def __init__(
         self,
         clearbit_api_key: Optional[str] = None,
-        rate_limiter: Optional[RateLimiter] = None
+        rate_limiter: Optional[Union[RateLimiter, TokenBucketRateLimiter]] = None,
+        max_concurrency: int = 32,
+        cache_dir: Optional[str] = ".cache",
+        session: Optional[aiohttp.ClientSession] = None
     ):
         self.clearbit_api_key = clearbit_api_key or os.environ.get('CLEARBIT_API_KEY')
-        self.rate_limiter = rate_limiter or RateLimiter(min_delay=1.0, max_delay=2.0)
-        self.session: Optional[aiohttp.ClientSession] = None
+        # Requests go to many different hosts, so allow bursts instead of spacing every call apart
+        self.rate_limiter = rate_limiter or TokenBucketRateLimiter(max_tokens=20, refill_interval=1.0)
+        self.max_concurrency = max_concurrency
+        self.cache = EnrichmentCache(cache_dir) if cache_dir else None
+        self.session: Optional[aiohttp.ClientSession] = session
+        self._owns_session = session is None
+        self.headers: Dict[str, str] = {}
+        self.timeout = aiohttp.ClientTimeout(total=30)
     
     async def __aenter__(self):
         """Async context manager entry."""
-        headers = {
+        # Sent per request so a session shared with the scrapers keeps its own defaults
+        self.headers = {
             'User-Agent': get_random_user_agent(),
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
-            'Accept-Language': 'en-US,en;q=0.9'
+            'Accept-Language': 'en-US,en;q=0.9',
+            'Connection': 'keep-alive'
         }
         
-        timeout = aiohttp.ClientTimeout(total=30)
-        self.session = aiohttp.ClientSession(headers=headers, timeout=timeout)
+        if not self._owns_session:
+            return self
+        
+        # Pool connections so repeat hosts (Clearbit especially) skip DNS and TLS setup
+        connector = aiohttp.TCPConnector(
+            limit=self.max_concurrency,
+            limit_per_host=4,
+            ttl_dns_cache=300,
+            keepalive_timeout=30,
+            enable_cleanup_closed=True
+        )
+        self.session = aiohttp.ClientSession(connector=connector)
         return self
     
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         """Async context manager exit."""
-        if self.session:
+        if self.session and self._owns_session:
             await self.session.close()
+        if self.cache:
+            self.cache.close()
     
-    async def enrich_leads(self, leads: List[Lead]) -> List[Lead]:
-        """Enrich multiple leads with company information."""
+    async def enrich_leads(
+        self,
+        leads: List[Lead],
+        on_progress: Optional[Callable[[int, int], None]] = None
+    ) -> List[Lead]:
+        """Enrich multiple leads with company information, reporting (done, total) as each finishes."""
         logger.info(f"Enriching {len(leads)} leads...")
         
-        tasks = []
-        for lead in leads:
-            if not lead.company_info:
-                task = self.enrich_single_lead(lead)
-                tasks.append(task)
+        sem = asyncio.Semaphore(self.max_concurrency)
+        
+        async def bounded_enrich(lead: Lead) -> Lead:
+            async with sem:
+                return await self.enrich_single_lead(lead)
+        
+        tasks = [bounded_enrich(lead) for lead in leads if not lead.company_info]
         
-        if tasks:
-            await asyncio.gather(*tasks, return_exceptions=True)
+        for done, next_done in enumerate(asyncio.as_completed(tasks), start=1):
+            try:
+                await next_done
+            except Exception as e:
+                logger.debug(f"Enrichment failed: {e}")
+            
+            if on_progress:
+                on_progress(done, len(tasks))
         
         return leads
     
@@ -82,12 +190,13 @@ class CompanyEnricher:
             if website_data:
                 # Merge website data with Clearbit data
                 website_info = self._parse_website_data(website_data)
-                for field, value in website_info.dict(exclude_unset=True).items():
+                for field in model_fields_set(website_info):
+                    value = getattr(website_info, field)
                     if value and not getattr(company_info, field):
                         setattr(company_info, field, value)
         
         # Only set company info if we found something
-        if company_info.dict(exclude_unset=True):
+        if model_fields_set(company_info):
             lead.company_info = company_info
             logger.debug(f"Enriched {lead.domain} with company info")
         
@@ -98,15 +207,25 @@ class CompanyEnricher:
         if not self.clearbit_api_key:
             return None
         
+        if self.cache:
+            cached = await self.cache.aget('clearbit', domain)
+            if cached is not None:
+                return loads_json(cached)
+        
         url = f"https://company.clearbit.com/v2/companies/find?domain={domain}"
-        headers = {'Authorization': f'Bearer {self.clearbit_api_key}'}
+        headers = {**self.headers, 'Authorization': f'Bearer {self.clearbit_api_key}'}
         
-        self.rate_limiter.wait()
+        await self.rate_limiter.await_slot()
         
         try:
-            async with self.session.get(url, headers=headers) as response:
+            response = await with_backoff(lambda: self.session.get(url, headers=headers, timeout=self.timeout))
+            async with response:
                 if response.status == 200:
-                    return await response.json()
+                    body = await response.read()
+                    data = loads_json(body)
+                    if self.cache:
+                        await self.cache.aset('clearbit', domain, body)
+                    return data
                 elif response.status == 404:
                     logger.debug(f"No Clearbit data found for {domain}")
                 else:
@@ -151,15 +270,27 @@ class CompanyEnricher:
         """Fetch data from company website."""
         url = normalize_url(domain)
         
-        self.rate_limiter.wait()
+        if self.cache:
+            cached = await self.cache.aget('website', domain)
+            if cached is not None:
+                return {
+                    'html': cached,
+                    'final_url': url
+                }
+        
+        await self.rate_limiter.await_slot()
         
         try:
-            async with self.session.get(url, allow_redirects=True) as response:
+            async with self.session.get(
+                url, headers=self.headers, timeout=self.timeout, allow_redirects=True
+            ) as response:
                 if response.status != 200:
                     logger.debug(f"Failed to fetch {url}: {response.status}")
                     return None
                 
-                html = await response.text()
+                html = await response.read()
+                if self.cache:
+                    await self.cache.aset('website', domain, html)
                 return {
                     'html': html,
                     'final_url': str(response.url)
@@ -174,7 +305,8 @@ class CompanyEnricher:
         html = data['html']
         
         try:
-            soup = BeautifulSoup(html, 'html.parser')
+            # Raw bytes let BeautifulSoup sniff the charset (cchardet when installed)
+            soup = BeautifulSoup(html, HTML_PARSER)
             
             # Extract title
             title_tag = soup.find('title')
@@ -182,29 +314,16 @@ class CompanyEnricher:
                 info.website_title = title_tag.text.strip()
             
             # Look for LinkedIn URL
-            linkedin_patterns = [
-                r'linkedin\.com/company/([a-zA-Z0-9-]+)',
-                r'linkedin\.com/in/([a-zA-Z0-9-]+)'
-            ]
-            
-            for link in soup.find_all('a', href=True):
-                href = link['href']
-                for pattern in linkedin_patterns:
-                    if re.search(pattern, href):
-                        info.linkedin_url = href
-                        break
-                if info.linkedin_url:
-                    break
+            linkedin_link = soup.select_one(LINKEDIN_LINK_SELECTOR)
+            if linkedin_link:
+                info.linkedin_url = linkedin_link['href']
             
             # Extract contact information
-            # Look in common contact sections
-            contact_sections = soup.find_all(['div', 'section', 'footer'], 
-                                            class_=re.compile(r'contact|footer', re.I))
-            
-            contact_text = ' '.join(section.get_text() for section in contact_sections)
+            # Prefer the first contact/footer section, then fall back to the whole page
+            contact_section = soup.select_one(CONTACT_SECTION_SELECTOR)
+            contact_text = contact_section.get_text(' ', strip=True) if contact_section else ''
             
-            # Also check the entire page for contact info
-            full_text = soup.get_text()
+            full_text = soup.get_text(' ', strip=True)
             
             # Extract email
             if not info.email:
@@ -219,14 +338,8 @@ class CompanyEnricher:
                     info.phone = phone
             
             # Look for company size indicators
-            size_patterns = [
-                (r'(\d+)\+?\s*employees', lambda m: f"{m.group(1)}+ employees"),
-                (r'team of (\d+)', lambda m: f"~{m.group(1)} employees"),
-                (r'(\d+)-(\d+)\s*employees', lambda m: f"{m.group(1)}-{m.group(2)} employees")
-            ]
-            
-            for pattern, formatter in size_patterns:
-                match = re.search(pattern, full_text, re.I)
+            for pattern, formatter in _SIZE_RES:
+                match = pattern.search(full_text)
                 if match:
                     info.company_size = formatter(match)
                     break
@@ -239,8 +352,13 @@ class CompanyEnricher:
 
 async def enrich_leads(
     leads: List[Lead],
-    clearbit_api_key: Optional[str] = None
+    clearbit_api_key: Optional[str] = None,
+    cache_dir: Optional[str] = ".cache",
+    on_progress: Optional[Callable[[int, int], None]] = None,
+    session: Optional[aiohttp.ClientSession] = None
 ) -> List[Lead]:
     """Convenience function to enrich leads."""
-    async with CompanyEnricher(clearbit_api_key=clearbit_api_key) as enricher:
-        return await enricher.enrich_leads(leads)
+    async with CompanyEnricher(
+        clearbit_api_key=clearbit_api_key, cache_dir=cache_dir, session=session
+    ) as enricher:
+        return await enricher.enrich_leads(leads, on_progress=on_progress)
@@ -1,6 +1,7 @@
 """Google Ads Transparency Center scraper."""
 import asyncio
-import json
+import contextlib
+import sys
 from typing import List, Optional, Dict, Any
 from datetime import datetime, timedelta
 import aiohttp
@@ -9,7 +10,8 @@ from urllib.parse import quote
 from .models import AdCreative, AdSource, Lead
 from .utils import (
     RateLimiter, retry_on_exception, setup_logger,
-    extract_domain, clean_company_name, get_random_user_agent
+    extract_domain, clean_company_name, get_random_user_agent,
+    coerce_http_url, loads_json
 )
 
 logger = setup_logger(__name__)
@@ -20,24 +22,32 @@ class GoogleAdsScraper:
     
     BASE_URL = "https://transparencyreport.google.com/transparencyreport/api/v3/ads/creatives"
     
-    def __init__(self, rate_limiter: Optional[RateLimiter] = None):
+    def __init__(
+        self,
+        rate_limiter: Optional[RateLimiter] = None,
+        session: Optional[aiohttp.ClientSession] = None
+    ):
         self.rate_limiter = rate_limiter or RateLimiter(min_delay=2.0, max_delay=4.0)
-        self.session: Optional[aiohttp.ClientSession] = None
+        self.session: Optional[aiohttp.ClientSession] = session
+        self._owns_session = session is None
+        self.headers: Dict[str, str] = {}
     
     async def __aenter__(self):
         """Async context manager entry."""
-        headers = {
+        # Sent per request so a session shared with other scrapers keeps its own defaults
+        self.headers = {
             'User-Agent': get_random_user_agent(),
             'Accept': 'application/json',
             'Accept-Language': 'en-US,en;q=0.9',
             'Referer': 'https://transparencyreport.google.com/political-ads/home'
         }
-        self.session = aiohttp.ClientSession(headers=headers)
+        if self._owns_session:
+            self.session = aiohttp.ClientSession()
         return self
     
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         """Async context manager exit."""
-        if self.session:
+        if self.session and self._owns_session:
             await self.session.close()
     
     @retry_on_exception(max_attempts=3, delay=2.0)
@@ -76,56 +86,79 @@ class GoogleAdsScraper:
             params['query'] = query
         
         total_fetched = 0
-        page_token = ''
+        pending: Optional[asyncio.Task] = asyncio.create_task(self._fetch_page(params))
         
-        while total_fetched < max_results:
-            self.rate_limiter.wait()
-            
-            if page_token:
-                params['page_token'] = page_token
-            
-            try:
-                async with self.session.get(self.BASE_URL, params=params) as response:
-                    if response.status != 200:
-                        logger.error(f"Google Ads API error: {response.status}")
-                        break
-                    
-                    data = await response.json()
-                    
-                    # Parse advertisers from response
-                    advertisers = data.get('advertisers', [])
-                    if not advertisers:
-                        logger.info("No more advertisers found")
-                        break
-                    
-                    for advertiser in advertisers:
-                        lead = self._parse_advertiser(advertiser)
-                        if lead:
-                            leads.append(lead)
-                            total_fetched += 1
-                            
-                            if total_fetched >= max_results:
-                                break
-                    
-                    # Check for next page
-                    page_token = data.get('next_page_token', '')
-                    if not page_token:
-                        break
+        try:
+            while pending and total_fetched < max_results:
+                data = await pending
+                pending = None
+                if data is None:
+                    break
+                
+                # Parse advertisers from response
+                advertisers = data.get('advertisers', [])
+                if not advertisers:
+                    logger.info("No more advertisers found")
+                    break
+                
+                page_token = data.get('next_page_token', '')
+                next_params = {**params, 'page_token': page_token} if page_token else None
+                
+                # Start fetching the next page while this one is parsed, unless this page can fill max_results
+                if next_params and total_fetched + len(advertisers) < max_results:
+                    pending = asyncio.create_task(self._fetch_page(next_params))
+                
+                now = datetime.utcnow()
+                for advertiser in advertisers:
+                    lead = self._parse_advertiser(advertiser, now)
+                    if lead:
+                        leads.append(lead)
+                        total_fetched += 1
                         
-            except Exception as e:
-                logger.error(f"Error fetching Google Ads data: {e}")
-                break
+                        if total_fetched >= max_results:
+                            break
+                
+                # Skipped advertisers left this page short, so fetch the next one after all
+                if not pending and next_params and total_fetched < max_results:
+                    pending = asyncio.create_task(self._fetch_page(next_params))
+                
+                # Release this page's payload before waiting on the next one
+                data = advertisers = None
+                    
+        except Exception as e:
+            logger.error(f"Error fetching Google Ads data: {e}")
+        finally:
+            if pending:
+                pending.cancel()
+                # Retrieve the outcome so a prefetch that already failed isn't reported as never retrieved
+                with contextlib.suppress(asyncio.CancelledError, Exception):
+                    await pending
         
         logger.info(f"Found {len(leads)} advertisers from Google Ads")
         return leads
     
-    def _parse_advertiser(self, advertiser_data: Dict[str, Any]) -> Optional[Lead]:
+    async def _fetch_page(self, params: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Fetch one page of advertisers; None when the API returns an error status."""
+        await self.rate_limiter.await_slot()
+        
+        async with self.session.get(self.BASE_URL, params=params, headers=self.headers) as response:
+            if response.status != 200:
+                logger.error(f"Google Ads API error: {response.status}")
+                return None
+            
+            # Decode the raw body directly; skips aiohttp's content-type check and stdlib json
+            return loads_json(await response.read())
+    
+    def _parse_advertiser(self, advertiser_data: Dict[str, Any], now: Optional[datetime] = None) -> Optional[Lead]:
         """Parse advertiser data into Lead object."""
+        now = now or datetime.utcnow()
         try:
             # Extract basic info
             advertiser_name = advertiser_data.get('advertiser_name', '').strip()
             if not advertiser_name:
                 return None
+            # Every creative repeats the name, so share one interned copy
+            advertiser_name = sys.intern(advertiser_name)
             
             # Extract domain from advertiser info or ads
             domain = None
@@ -136,14 +169,18 @@ class GoogleAdsScraper:
             if advertiser_url:
                 domain = extract_domain(advertiser_url)
             
-            # Parse ad creatives
+            # Parse ad creatives, totalling metrics in the same pass
             creatives = []
+            total_impressions = 0
+            total_spend = 0.0
             for ad in advertiser_data.get('ads', []):
-                creative = self._parse_ad_creative(ad, advertiser_name)
+                creative = self._parse_ad_creative(ad, advertiser_name, now)
                 if creative:
                     creatives.append(creative)
+                    total_impressions += creative.impressions or 0
+                    total_spend += creative.spend_estimate or 0
                     if creative.landing_page_url:
-                        landing_urls.append(str(creative.landing_page_url))
+                        landing_urls.append(creative.landing_page_url)
             
             # If no domain from advertiser, try to extract from ads
             if not domain and landing_urls:
@@ -156,16 +193,12 @@ class GoogleAdsScraper:
                 logger.warning(f"No domain found for advertiser: {advertiser_name}")
                 return None
             
-            # Calculate metrics
-            total_impressions = sum(c.impressions or 0 for c in creatives)
-            total_spend = sum(c.spend_estimate or 0 for c in creatives)
-            
-            # Create lead
-            lead = Lead(
-                domain=domain,
+            # Create lead (fields were coerced above, so skip pydantic validation)
+            lead = Lead.unchecked(
+                domain=sys.intern(domain),
                 company_name=clean_company_name(advertiser_name),
-                first_seen=datetime.utcnow(),
-                last_seen=datetime.utcnow(),
+                first_seen=now,
+                last_seen=now,
                 sources=[AdSource.GOOGLE_ADS],
                 ad_creatives=creatives,
                 total_impressions=total_impressions if total_impressions > 0 else None,
@@ -178,15 +211,22 @@ class GoogleAdsScraper:
             logger.error(f"Error parsing advertiser data: {e}")
             return None
     
-    def _parse_ad_creative(self, ad_data: Dict[str, Any], advertiser_name: str) -> Optional[AdCreative]:
+    def _parse_ad_creative(
+        self,
+        ad_data: Dict[str, Any],
+        advertiser_name: str,
+        now: Optional[datetime] = None
+    ) -> Optional[AdCreative]:
         """Parse individual ad creative."""
         try:
-            creative = AdCreative(
-                ad_id=ad_data.get('ad_id'),
+            ad_id = ad_data.get('ad_id')
+            creative = AdCreative.unchecked(
+                ad_id=str(ad_id) if ad_id is not None else None,
                 advertiser_name=advertiser_name,
-                creative_url=ad_data.get('creative_url'),
-                landing_page_url=ad_data.get('landing_page_url'),
-                source=AdSource.GOOGLE_ADS
+                creative_url=coerce_http_url(ad_data.get('creative_url')),
+                landing_page_url=coerce_http_url(ad_data.get('landing_page_url')),
+                source=AdSource.GOOGLE_ADS,
+                scraped_at=now or datetime.utcnow()
             )
             
             # Parse date if available
@@ -224,10 +264,11 @@ async def scrape_google_ads(
     query: str = "",
     region: str = "US", 
     start_date: Optional[datetime] = None,
-    max_results: int = 100
+    max_results: int = 100,
+    session: Optional[aiohttp.ClientSession] = None
 ) -> List[Lead]:
     """Convenience function to scrape Google Ads."""
-    async with GoogleAdsScraper() as scraper:
+    async with GoogleAdsScraper(session=session) as scraper:
         return await scraper.search_advertisers(
             query=query,
             region=region,
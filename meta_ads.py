@@ -1,44 +1,70 @@
 """Meta Ad Library scraper."""
 import asyncio
 import os
+import re
+from functools import lru_cache
+from itertools import chain
 from typing import List, Optional, Dict, Any
-from datetime import datetime
+from datetime import datetime, timezone
 import aiohttp
 
 from .models import AdCreative, AdSource, Lead
 from .utils import (
     RateLimiter, retry_on_exception, setup_logger,
-    extract_domain, clean_company_name, get_random_user_agent
+    extract_domain, clean_company_name, get_random_user_agent, loads_json,
+    with_backoff, coerce_http_url
 )
 
 logger = setup_logger(__name__)
 
+# Cheap pre-check for something shaped like a hostname inside ad link text
+_DOMAIN_HINT_RE = re.compile(r'\b(?:[a-z0-9-]+\.)+[a-z]{2,}\b', re.I)
+
+
+@lru_cache(maxsize=4096)
+def _parse_timestamp(value: str) -> datetime:
+    """Parse a Meta ISO-8601 timestamp as naive UTC; repeated values hit the cache."""
+    parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    # Other sources stamp leads with naive utcnow(), and merge_with compares them
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
 
 class MetaAdsScraper:
     """Scraper for Meta Ad Library."""
     
     BASE_URL = "https://graph.facebook.com/v18.0/ads_archive"
     
-    def __init__(self, access_token: Optional[str] = None, rate_limiter: Optional[RateLimiter] = None):
+    def __init__(
+        self,
+        access_token: Optional[str] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        session: Optional[aiohttp.ClientSession] = None
+    ):
         self.access_token = access_token or os.environ.get('META_ACCESS_TOKEN', '')
         self.rate_limiter = rate_limiter or RateLimiter(min_delay=1.0, max_delay=2.0)
-        self.session: Optional[aiohttp.ClientSession] = None
+        self.session: Optional[aiohttp.ClientSession] = session
+        self._owns_session = session is None
+        self.headers: Dict[str, str] = {}
         
         if not self.access_token:
             logger.warning("No Meta access token provided. Set META_ACCESS_TOKEN env var.")
     
     async def __aenter__(self):
         """Async context manager entry."""
-        headers = {
+        # Sent per request so a session shared with other scrapers keeps its own defaults
+        self.headers = {
             'User-Agent': get_random_user_agent(),
             'Accept': 'application/json'
         }
-        self.session = aiohttp.ClientSession(headers=headers)
+        if self._owns_session:
+            self.session = aiohttp.ClientSession()
         return self
     
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         """Async context manager exit."""
-        if self.session:
+        if self.session and self._owns_session:
             await self.session.close()
     
     @retry_on_exception(max_attempts=3, delay=2.0)
@@ -76,30 +102,37 @@ class MetaAdsScraper:
         next_url = self.BASE_URL
         
         while total_fetched < limit and next_url:
-            self.rate_limiter.wait()
+            await self.rate_limiter.await_slot()
             
             try:
-                async with self.session.get(next_url, params=params if next_url == self.BASE_URL else None) as response:
+                response = await with_backoff(
+                    lambda: self.session.get(
+                        next_url,
+                        params=params if next_url == self.BASE_URL else None,
+                        headers=self.headers
+                    )
+                )
+                async with response:
                     if response.status != 200:
                         error_data = await response.text()
                         logger.error(f"Meta API error: {response.status} - {error_data}")
                         break
                     
-                    data = await response.json()
+                    data = loads_json(await response.read())
                     ads = data.get('data', [])
                     
                     if not ads:
                         logger.info("No more ads found")
                         break
                     
+                    now = datetime.utcnow()
                     for ad in ads:
-                        lead = self._parse_ad(ad)
+                        lead = self._parse_ad(ad, now)
                         if lead:
                             # Merge with existing lead if same domain
-                            if lead.domain in leads_map:
-                                leads_map[lead.domain].merge_with(lead)
-                            else:
-                                leads_map[lead.domain] = lead
+                            existing = leads_map.setdefault(lead.domain, lead)
+                            if existing is not lead:
+                                existing.merge_with(lead)
                             
                             total_fetched += 1
                             if total_fetched >= limit:
@@ -120,8 +153,9 @@ class MetaAdsScraper:
         logger.info(f"Found {len(leads)} unique advertisers from Meta")
         return leads
     
-    def _parse_ad(self, ad_data: Dict[str, Any]) -> Optional[Lead]:
+    def _parse_ad(self, ad_data: Dict[str, Any], now: Optional[datetime] = None) -> Optional[Lead]:
         """Parse Meta ad data into Lead object."""
+        now = now or datetime.utcnow()
         try:
             # Extract advertiser info
             page_name = ad_data.get('page_name', '').strip()
@@ -138,16 +172,20 @@ class MetaAdsScraper:
             link_titles = ad_data.get('ad_creative_link_titles', [])
             
             # Try to find domain in link texts
-            for texts in [link_captions, link_descriptions, link_titles]:
-                if texts and isinstance(texts, list):
-                    for text in texts:
-                        if '.' in text and len(text) < 50:  # Might be a domain
-                            potential_domain = extract_domain(text)
-                            if potential_domain:
-                                domain = potential_domain
-                                break
-                if domain:
-                    break
+            link_texts = chain.from_iterable(
+                texts for texts in (link_captions, link_descriptions, link_titles)
+                if texts and isinstance(texts, list)
+            )
+            for text in link_texts:
+                if len(text) >= 50:  # Too long to be a bare domain
+                    continue
+                hint = _DOMAIN_HINT_RE.search(text)
+                if hint:
+                    # Captions are usually bare hosts, which urlparse only reads with a scheme
+                    potential_domain = extract_domain(f"https://{hint.group(0)}")
+                    if potential_domain:
+                        domain = potential_domain
+                        break
             
             # If no domain found, use page name as company name
             if not domain:
@@ -159,16 +197,15 @@ class MetaAdsScraper:
             creative = AdCreative(
                 ad_id=ad_data.get('id'),
                 advertiser_name=page_name,
-                creative_url=ad_snapshot_url if ad_snapshot_url else None,
-                source=AdSource.META_ADS
+                creative_url=coerce_http_url(ad_snapshot_url),
+                source=AdSource.META_ADS,
+                scraped_at=now
             )
             
             # Parse dates
             if 'ad_creation_time' in ad_data:
                 try:
-                    creative.campaign_start_date = datetime.fromisoformat(
-                        ad_data['ad_creation_time'].replace('Z', '+00:00')
-                    )
+                    creative.campaign_start_date = _parse_timestamp(ad_data['ad_creation_time'])
                 except:
                     pass
             
@@ -203,8 +240,8 @@ class MetaAdsScraper:
             lead = Lead(
                 domain=domain,
                 company_name=clean_company_name(page_name),
-                first_seen=creative.campaign_start_date or datetime.utcnow(),
-                last_seen=datetime.utcnow(),
+                first_seen=creative.campaign_start_date or now,
+                last_seen=now,
                 sources=[AdSource.META_ADS],
                 ad_creatives=[creative],
                 total_impressions=creative.impressions,
@@ -223,10 +260,11 @@ async def scrape_meta_ads(
     ad_reached_countries: str = "US",
     ad_active_status: str = "ACTIVE",
     limit: int = 100,
-    access_token: Optional[str] = None
+    access_token: Optional[str] = None,
+    session: Optional[aiohttp.ClientSession] = None
 ) -> List[Lead]:
     """Convenience function to scrape Meta ads."""
-    async with MetaAdsScraper(access_token=access_token) as scraper:
+    async with MetaAdsScraper(access_token=access_token, session=session) as scraper:
         return await scraper.search_ads(
             search_terms=search_terms,
             ad_reached_countries=ad_reached_countries,
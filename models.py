@@ -1,10 +1,30 @@
 """Pydantic models for lead scraper data structures."""
 from datetime import datetime
-from typing import Optional, List
-from pydantic import BaseModel, HttpUrl, EmailStr, Field
+from typing import Iterable, Optional, List, Set, Type, TypeVar
+from pydantic import BaseModel, HttpUrl, EmailStr, Field, PrivateAttr
 from enum import Enum
 
 
+ModelT = TypeVar('ModelT', bound='UncheckedModel')
+
+
+class UncheckedModel(BaseModel):
+    """Base model that can also be built from trusted values without validation."""
+    
+    @classmethod
+    def unchecked(cls: Type[ModelT], **values) -> ModelT:
+        """Build from already-trusted values, skipping pydantic validation."""
+        # model_construct on pydantic v2, construct on v1
+        return (getattr(cls, 'model_construct', None) or cls.construct)(**values)
+
+
+def model_fields_set(model: BaseModel) -> Set[str]:
+    """Names of the fields explicitly set on a model instance."""
+    # model_fields_set on pydantic v2, __fields_set__ on v1
+    fields = getattr(model, 'model_fields_set', None)
+    return model.__fields_set__ if fields is None else fields
+
+
 class AdSource(str, Enum):
     """Enum for ad platforms."""
     GOOGLE_ADS = "google_ads"
@@ -13,20 +33,21 @@ class AdSource(str, Enum):
     SHOPPING_ADS = "shopping_ads"
 
 
-class AdCreative(BaseModel):
+class AdCreative(UncheckedModel):
     """Model for ad creative data."""
     ad_id: Optional[str] = None
     advertiser_name: str
-    creative_url: Optional[HttpUrl] = None
+    # Plain strings: scrapers check URLs once with utils.coerce_http_url instead
+    creative_url: Optional[str] = None
     campaign_start_date: Optional[datetime] = None
     impressions: Optional[int] = None
     spend_estimate: Optional[float] = None
-    landing_page_url: Optional[HttpUrl] = None
+    landing_page_url: Optional[str] = None
     source: AdSource
     scraped_at: datetime = Field(default_factory=datetime.utcnow)
 
 
-class CompanyInfo(BaseModel):
+class CompanyInfo(UncheckedModel):
     """Model for enriched company information."""
     website_title: Optional[str] = None
     linkedin_url: Optional[HttpUrl] = None
@@ -36,7 +57,7 @@ class CompanyInfo(BaseModel):
     industry: Optional[str] = None
 
 
-class Lead(BaseModel):
+class Lead(UncheckedModel):
     """Model for a deduplicated lead record."""
     domain: str
     company_name: str
@@ -49,30 +70,53 @@ class Lead(BaseModel):
     total_spend_estimate: Optional[float] = None
     is_active: bool = True
     
+    # Membership indices, built on first use and kept in step with the lists
+    _source_set: Optional[Set[AdSource]] = PrivateAttr(default=None)
+    _ad_id_index: Optional[Set[str]] = PrivateAttr(default=None)
+    
+    def add_creative(self, ad: AdCreative) -> bool:
+        """Append a creative unless one with the same ad_id is already present."""
+        if self._ad_id_index is None:
+            self._ad_id_index = {existing.ad_id for existing in self.ad_creatives if existing.ad_id}
+        
+        if ad.ad_id:
+            if ad.ad_id in self._ad_id_index:
+                return False
+            self._ad_id_index.add(ad.ad_id)
+        self.ad_creatives.append(ad)
+        return True
+    
+    def merge_many(self, others: Iterable['Lead']) -> None:
+        """Merge several leads for the same domain into this one."""
+        for other in others:
+            self.merge_with(other)
+    
     def merge_with(self, other: 'Lead') -> None:
         """Merge another lead's data into this one."""
         self.last_seen = max(self.last_seen, other.last_seen)
         self.first_seen = min(self.first_seen, other.first_seen)
         
+        if self._source_set is None:
+            self._source_set = set(self.sources)
+        
         # Merge sources
         for source in other.sources:
-            if source not in self.sources:
+            if source not in self._source_set:
                 self.sources.append(source)
+                self._source_set.add(source)
         
         # Merge ad creatives
-        existing_ad_ids = {ad.ad_id for ad in self.ad_creatives if ad.ad_id}
         for ad in other.ad_creatives:
-            if not ad.ad_id or ad.ad_id not in existing_ad_ids:
-                self.ad_creatives.append(ad)
+            self.add_creative(ad)
         
         # Update company info if better data available
-        if other.company_info and (not self.company_info or 
-                                    other.company_info.dict(exclude_unset=True)):
+        if other.company_info:
             if not self.company_info:
                 self.company_info = other.company_info
             else:
                 # Merge non-null fields
-                for field, value in other.company_info.dict(exclude_unset=True).items():
+                for field in model_fields_set(other.company_info):
+                    value = getattr(other.company_info, field)
                     if value and not getattr(self.company_info, field):
                         setattr(self.company_info, field, value)
         
@@ -1,63 +1,149 @@
 """Google Shopping Ads scraper using Playwright."""
 import asyncio
+import sys
+from collections import defaultdict
 from typing import List, Optional, Dict, Any
 from datetime import datetime
-from urllib.parse import quote
+from pathlib import Path
+from urllib.parse import parse_qs, quote, urlparse
 
-from playwright.async_api import async_playwright, Page, Browser
+from playwright.async_api import async_playwright, Page, Browser, BrowserContext
 
+from .browser import PagePool
 from .models import AdCreative, AdSource, Lead
 from .utils import (
     RateLimiter, retry_on_exception, setup_logger,
     extract_domain, clean_company_name, detect_captcha_block,
-    get_random_user_agent
+    get_random_user_agent, coerce_http_url
 )
 
 logger = setup_logger(__name__)
 
+# Google Shopping ads are usually marked with "Sponsored" or have specific attributes.
+# One selector list matches every variant, each card at most once, in document order.
+SPONSORED_PRODUCT_SELECTOR = ', '.join([
+    '.sh-dgr__content:has(.sh-sp__pswtr)',  # Sponsored label
+    '.sh-dgr__content:has-text("Sponsored")',
+    '[data-docid]:has(.sh-sp__pswtr)',
+    '.sh-pr__product:has(.sh-sp__pswtr)'
+])
+
+MERCHANT_SELECTORS = [
+    '.sh-dgr__merchant-name',
+    '.aULzUe',  # Alternative merchant selector
+    '[data-merchant-name]'
+]
+
+# Reads every matched product card in one round-trip instead of several per field
+EXTRACT_PRODUCTS_JS = """
+(elements, merchantSelectors) => elements.map(el => {
+    let merchant = null;
+    for (const selector of merchantSelectors) {
+        const text = el.querySelector(selector)?.innerText?.trim();
+        if (text) {
+            merchant = text;
+            break;
+        }
+    }
+    return {
+        title: el.querySelector('.sh-dgr__grid-result h3')?.innerText ?? null,
+        merchant: merchant,
+        href: el.querySelector('a[href*="url?q="]')?.getAttribute('href') ?? null,
+        price: el.querySelector('.sh-dgr__grid-result span[aria-label*="price"]')?.innerText ?? null,
+        productHref: el.querySelector('a.sh-dgr__grid-result')?.getAttribute('href') ?? null
+    };
+})
+"""
+
 
 class ShoppingAdsScraper:
     """Scraper for Google Shopping Ads."""
     
     BASE_URL = "https://www.google.com/search"
+    # Static params (tbm=shop for Shopping results) are fixed; only the query varies
+    SEARCH_URL_PREFIX = f"{BASE_URL}?tbm=shop&hl=en&gl=us&q="
     
-    def __init__(self, rate_limiter: Optional[RateLimiter] = None, headless: bool = True):
+    def __init__(
+        self,
+        rate_limiter: Optional[RateLimiter] = None,
+        headless: bool = True,
+        browser: Optional[Browser] = None,
+        max_concurrency: int = 3,
+        storage_state_path: Optional[str] = ".cache/shopping_state.json"
+    ):
         self.rate_limiter = rate_limiter or RateLimiter(min_delay=3.0, max_delay=5.0)
         self.headless = headless
-        self.browser: Optional[Browser] = None
-        self.page: Optional[Page] = None
+        self.max_concurrency = max_concurrency
+        self._playwright = None
+        self.browser: Optional[Browser] = browser
+        self._owns_browser = browser is None
+        self._contexts: List[BrowserContext] = []
+        self._pool: Optional[PagePool] = None
+        # Cookies (consent, bot checks) carried between runs; None disables persistence
+        self.storage_state_path = storage_state_path
     
     async def __aenter__(self):
         """Async context manager entry."""
-        playwright = await async_playwright().start()
-        self.browser = await playwright.chromium.launch(headless=self.headless)
+        if self._owns_browser:
+            self._playwright = await async_playwright().start()
+            self.browser = await self._playwright.chromium.launch(headless=self.headless)
         
-        # Create page with anti-detection measures
+        self._pool = await PagePool(
+            self._new_worker_page, size=self.max_concurrency, page_initiator=self._init_page
+        ).start()
+        return self
+    
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        """Async context manager exit."""
+        if self._pool:
+            await self._pool.close()
+            self._pool = None
+        if self._contexts and self.storage_state_path:
+            await self._save_storage_state(self._contexts[0])
+        for context in self._contexts:
+            await context.close()
+        self._contexts.clear()
+        if self.browser and self._owns_browser:
+            await self.browser.close()
+        if self._playwright:
+            await self._playwright.stop()
+    
+    async def _new_worker_page(self) -> Page:
+        """Open a page in its own context so concurrent queries don't share DOM work."""
+        # Create context with anti-detection measures
         context = await self.browser.new_context(
+            storage_state=self._stored_state(),
             user_agent=get_random_user_agent(),
             viewport={'width': 1920, 'height': 1080},
             locale='en-US',
             geolocation={'latitude': 45.5152, 'longitude': -122.6784},  # Portland, OR
             permissions=['geolocation']
         )
-        
-        self.page = await context.new_page()
-        
+        self._contexts.append(context)
+        return await context.new_page()
+    
+    def _stored_state(self) -> Optional[str]:
+        """Path of the saved context state, if a previous run left one."""
+        if self.storage_state_path and Path(self.storage_state_path).is_file():
+            return self.storage_state_path
+        return None
+    
+    async def _save_storage_state(self, context: BrowserContext) -> None:
+        """Persist cookies and local storage so the next run skips consent screens."""
+        try:
+            Path(self.storage_state_path).parent.mkdir(parents=True, exist_ok=True)
+            await context.storage_state(path=self.storage_state_path)
+        except Exception as e:
+            logger.warning(f"Could not save Shopping browser state: {e}")
+    
+    async def _init_page(self, page: Page) -> None:
+        """Apply per-page settings to a newly created pooled page."""
         # Set additional headers
-        await self.page.set_extra_http_headers({
+        await page.set_extra_http_headers({
             'Accept-Language': 'en-US,en;q=0.9',
             'Accept-Encoding': 'gzip, deflate, br',
             'Cache-Control': 'no-cache'
         })
-        
-        return self
-    
-    async def __aexit__(self, exc_type, exc_val, exc_tb):
-        """Async context manager exit."""
-        if self.page:
-            await self.page.close()
-        if self.browser:
-            await self.browser.close()
     
     @retry_on_exception(max_attempts=2, delay=5.0)
     async def search_shopping_ads(
@@ -66,86 +152,76 @@ class ShoppingAdsScraper:
         max_results_per_query: int = 20
     ) -> List[Lead]:
         """Search for shopping ads on Google."""
-        if not self.page:
+        if not self._pool:
             raise RuntimeError("Browser not initialized. Use async context manager.")
         
-        all_leads: Dict[str, Lead] = {}
+        sem = asyncio.Semaphore(self.max_concurrency)
         
-        for query in search_queries:
-            logger.info(f"Searching Google Shopping for: {query}")
-            leads = await self._search_single_query(query, max_results_per_query)
-            
-            # Merge leads
+        async def run_query(query: str) -> List[Lead]:
+            async with sem, self._pool.acquire() as page:
+                logger.info(f"Searching Google Shopping for: {query}")
+                return await self._search_single_query(page, query, max_results_per_query)
+        
+        results = await asyncio.gather(*(run_query(query) for query in search_queries))
+        
+        # Merge leads, folding each domain's duplicates into its first lead at once
+        buckets: Dict[str, List[Lead]] = defaultdict(list)
+        for leads in results:
             for lead in leads:
-                if lead.domain in all_leads:
-                    all_leads[lead.domain].merge_with(lead)
-                else:
-                    all_leads[lead.domain] = lead
+                buckets[lead.domain].append(lead)
         
-        return list(all_leads.values())
+        merged = []
+        for first, *duplicates in buckets.values():
+            first.merge_many(duplicates)
+            merged.append(first)
+        return merged
     
-    async def _search_single_query(self, query: str, max_results: int) -> List[Lead]:
+    async def _search_single_query(self, page: Page, query: str, max_results: int) -> List[Lead]:
         """Search for a single query."""
         leads = []
         
         # Build search URL for shopping results
-        params = {
-            'q': query,
-            'tbm': 'shop',  # Shopping results
-            'hl': 'en',
-            'gl': 'us'
-        }
-        url = f"{self.BASE_URL}?{'&'.join(f'{k}={quote(str(v))}' for k, v in params.items())}"
+        url = self.SEARCH_URL_PREFIX + quote(query)
         
-        self.rate_limiter.wait()
+        await self.rate_limiter.await_slot()
         
         try:
             # Navigate to search page
-            await self.page.goto(url, wait_until='networkidle', timeout=30000)
+            await page.goto(url, wait_until='networkidle', timeout=30000)
             
             # Wait for results to load
-            await self.page.wait_for_selector('.sh-dgr__content', timeout=10000)
+            await page.wait_for_selector('.sh-dgr__content', timeout=10000)
             
             # Check for CAPTCHA
-            page_content = await self.page.content()
+            page_content = await page.content()
             if detect_captcha_block(page_content):
                 logger.warning("CAPTCHA detected on Google Shopping. Skipping.")
                 return leads
             
-            # Look for sponsored shopping results
-            # Google Shopping ads are usually marked with "Sponsored" or have specific attributes
-            sponsored_selectors = [
-                '.sh-dgr__content:has(.sh-sp__pswtr)',  # Sponsored label
-                '.sh-dgr__content:has-text("Sponsored")',
-                '[data-docid]:has(.sh-sp__pswtr)',
-                '.sh-pr__product:has(.sh-sp__pswtr)'
-            ]
-            
-            all_products = []
-            for selector in sponsored_selectors:
-                try:
-                    elements = await self.page.query_selector_all(selector)
-                    if elements:
-                        all_products.extend(elements)
-                        logger.debug(f"Found {len(elements)} sponsored items with selector: {selector}")
-                except:
-                    continue
+            # Look for sponsored shopping results in one round-trip
+            try:
+                records = await page.eval_on_selector_all(
+                    SPONSORED_PRODUCT_SELECTOR, EXTRACT_PRODUCTS_JS, MERCHANT_SELECTORS
+                )
+            except Exception as e:
+                logger.debug(f"Sponsored product lookup failed: {e}")
+                records = []
             
-            if not all_products:
+            if not records:
                 logger.warning("No sponsored shopping products found")
                 return leads
+            logger.debug(f"Found {len(records)} sponsored items")
             
             # Parse each sponsored product
             count = 0
             seen_merchants = set()
             
-            for element in all_products:
+            for record in records:
                 if count >= max_results:
                     break
                 
                 try:
-                    # Extract product data
-                    product_data = await self._extract_product_data(element)
+                    product_data = self._product_data_from_record(record)
                     if product_data:
                         merchant = product_data.get('merchant', '')
                         # Skip if we've already seen this merchant
@@ -166,62 +242,32 @@ class ShoppingAdsScraper:
         
         return leads
     
-    async def _extract_product_data(self, element) -> Optional[Dict[str, Any]]:
-        """Extract data from a shopping product element."""
-        try:
-            data = {}
-            
-            # Get product title
-            title_element = await element.query_selector('.sh-dgr__grid-result h3')
-            if title_element:
-                data['title'] = await title_element.inner_text()
-            
-            # Get merchant/store name
-            merchant_selectors = [
-                '.sh-dgr__merchant-name',
-                '.aULzUe',  # Alternative merchant selector
-                '[data-merchant-name]'
-            ]
-            
-            for selector in merchant_selectors:
-                merchant_element = await element.query_selector(selector)
-                if merchant_element:
-                    merchant_text = await merchant_element.inner_text()
-                    if merchant_text:
-                        data['merchant'] = merchant_text.strip()
-                        break
-            
-            # Get merchant domain if available
-            link_element = await element.query_selector('a[href*="url?q="]')
-            if link_element:
-                href = await link_element.get_attribute('href')
-                if href and 'url?q=' in href:
-                    # Extract actual URL from Google redirect
-                    import re
-                    match = re.search(r'url\?q=([^&]+)', href)
-                    if match:
-                        merchant_url = match.group(1)
-                        domain = extract_domain(merchant_url)
-                        if domain:
-                            data['domain'] = domain
-            
-            # Get price
-            price_element = await element.query_selector('.sh-dgr__grid-result span[aria-label*="price"]')
-            if price_element:
-                data['price'] = await price_element.inner_text()
-            
-            # Get product URL
-            product_link = await element.query_selector('a.sh-dgr__grid-result')
-            if product_link:
-                href = await product_link.get_attribute('href')
-                if href:
-                    data['product_url'] = f"https://www.google.com{href}" if href.startswith('/') else href
-            
-            return data if data.get('merchant') else None
-            
-        except Exception as e:
-            logger.error(f"Error extracting shopping product data: {e}")
+    def _product_data_from_record(self, record: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Turn one record returned by EXTRACT_PRODUCTS_JS into product data."""
+        if not record.get('merchant'):
             return None
+        
+        data = {'merchant': record['merchant']}
+        if record.get('title'):
+            data['title'] = record['title']
+        
+        # Extract actual merchant URL from Google redirect
+        href = record.get('href')
+        if href:
+            target = parse_qs(urlparse(href).query).get('q', [None])[0]
+            if target:
+                domain = extract_domain(target)
+                if domain:
+                    data['domain'] = domain
+        
+        if record.get('price'):
+            data['price'] = record['price']
+        
+        product_href = record.get('productHref')
+        if product_href:
+            data['product_url'] = f"https://www.google.com{product_href}" if product_href.startswith('/') else product_href
+        
+        return data
     
     def _create_lead_from_product(self, product_data: Dict[str, Any], search_query: str) -> Optional[Lead]:
         """Create a Lead object from shopping product data."""
@@ -237,22 +283,24 @@ class ShoppingAdsScraper:
                 domain = merchant.lower().replace(' ', '').replace('.', '') + '.shopping'
             
             # Clean merchant name
-            merchant = clean_company_name(merchant)
+            merchant = sys.intern(clean_company_name(merchant))
+            domain = sys.intern(domain)
             
             # Create ad creative
-            creative = AdCreative(
+            now = datetime.utcnow()
+            creative = AdCreative.unchecked(
                 advertiser_name=merchant,
-                landing_page_url=product_data.get('product_url'),
+                landing_page_url=coerce_http_url(product_data.get('product_url')),
                 source=AdSource.SHOPPING_ADS,
-                scraped_at=datetime.utcnow()
+                scraped_at=now
             )
             
             # Create lead
-            lead = Lead(
+            lead = Lead.unchecked(
                 domain=domain,
                 company_name=merchant,
-                first_seen=datetime.utcnow(),
-                last_seen=datetime.utcnow(),
+                first_seen=now,
+                last_seen=now,
                 sources=[AdSource.SHOPPING_ADS],
                 ad_creatives=[creative]
             )
@@ -267,10 +315,14 @@ class ShoppingAdsScraper:
 async def scrape_shopping_ads(
     search_queries: List[str],
     max_results_per_query: int = 20,
-    headless: bool = True
+    headless: bool = True,
+    browser: Optional[Browser] = None,
+    max_concurrency: int = 3
 ) -> List[Lead]:
     """Convenience function to scrape Google Shopping ads."""
-    async with ShoppingAdsScraper(headless=headless) as scraper:
+    async with ShoppingAdsScraper(
+        headless=headless, browser=browser, max_concurrency=max_concurrency
+    ) as scraper:
         return await scraper.search_shopping_ads(
             search_queries=search_queries,
             max_results_per_query=max_results_per_query
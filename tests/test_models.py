@@ -0,0 +1,32 @@
+"""Tests for Lead merging across sources."""
+from datetime import datetime
+
+from lead_scraper.meta_ads import MetaAdsScraper
+from lead_scraper.models import AdCreative, AdSource, Lead
+
+
+def test_merge_google_and_meta_leads_for_same_domain():
+    now = datetime.utcnow()
+    google_lead = Lead(
+        domain='acme.com',
+        company_name='Acme',
+        first_seen=now,
+        last_seen=now,
+        sources=[AdSource.GOOGLE_ADS],
+        ad_creatives=[AdCreative(ad_id='g1', advertiser_name='Acme', source=AdSource.GOOGLE_ADS)]
+    )
+    meta_lead = MetaAdsScraper(access_token='test')._parse_ad({
+        'id': 'm1',
+        'page_name': 'Acme',
+        'ad_creation_time': '2024-01-02T03:04:05Z',
+        'ad_creative_link_captions': ['acme.com']
+    }, now)
+    
+    assert meta_lead.domain == 'acme.com'
+    assert meta_lead.first_seen.tzinfo is None
+    
+    google_lead.merge_with(meta_lead)
+    
+    assert google_lead.first_seen == datetime(2024, 1, 2, 3, 4, 5)
+    assert google_lead.sources == [AdSource.GOOGLE_ADS, AdSource.META_ADS]
+    assert [ad.ad_id for ad in google_lead.ad_creatives] == ['g1', 'm1']
@@ -1,51 +1,216 @@
 """Utility functions for rate limiting, logging, and retries."""
+import asyncio
+import inspect
+import json
 import logging
 import time
 import random
-from functools import wraps
-from typing import Any, Callable, Optional, TypeVar, cast
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from functools import lru_cache, wraps
+from typing import Any, Awaitable, Callable, Final, Iterator, Optional, Tuple, TypeVar, Union, cast
 from urllib.parse import urlparse, urlunparse
 import re
+import string
+
+import aiohttp
 
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 )
+logger = logging.getLogger(__name__)
 
 # Type variable for generic decorator
 F = TypeVar('F', bound=Callable[..., Any])
 
+# BeautifulSoup parser: lxml's C parser when installed, stdlib parser otherwise
+try:
+    import lxml  # noqa: F401
+    HTML_PARSER = 'lxml'
+except ImportError:
+    HTML_PARSER = 'html.parser'
+
+# orjson decodes API payloads several times faster than the stdlib when installed
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# HTTP statuses worth retrying: rate limiting and transient server errors
+RETRYABLE_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+# Cheap stand-in for pydantic's HttpUrl check on ad creative URLs
+HTTP_URL_RE = re.compile(r'^https?://[^\s/$.?#][^\s]*$', re.IGNORECASE)
+
+# Host part of a plain http(s) URL, ending at the path, query or fragment
+URL_NETLOC_RE = re.compile(r'https?://([^/?#\s\[\]]*)(?:[/?#]|$)', re.IGNORECASE)
+
+# Scheme, host, path and query of an http(s) URL, for normalize_url
+URL_PARTS_RE = re.compile(r'(https?://)([^/?#]*)([^?#]*)(?:\?([^#]*))?')
+
+# Text extraction patterns, compiled once at import
+EMAIL_RE = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}\b')
+# Various US phone formats, tried in order
+PHONE_RES = [
+    re.compile(r'\b\d{3}[-.\s]?\d{3}[-.\s]?\d{4}\b'),  # 123-456-7890
+    re.compile(r'\b\(\d{3}\)\s?\d{3}[-.\s]?\d{4}\b'),   # (123) 456-7890
+    re.compile(r'\b\+1\s?\d{3}[-.\s]?\d{3}[-.\s]?\d{4}\b'),  # +1 123-456-7890
+]
+# Common company suffixes: a trailing Inc/LLC/... (optionally after GmbH/AG/...), or a
+# trailing GmbH/AG/...; one pass equivalent to stripping the first group, then the second
+_ENTITY_SUFFIXES = r'(?:Inc|LLC|Ltd|Limited|Corp|Corporation|Co|Company)'
+_REGIONAL_SUFFIXES = r'(?:GmbH|AG|S\.A\.|S\.L\.|B\.V\.)'
+COMPANY_SUFFIX_RE = re.compile(
+    rf'(?:\s+{_REGIONAL_SUFFIXES})?\s+{_ENTITY_SUFFIXES}\.?$|\s+{_REGIONAL_SUFFIXES}$',
+    re.IGNORECASE
+)
+# Page markers of a CAPTCHA or bot challenge ('captcha' also covers recaptcha/hcaptcha)
+CAPTCHA_INDICATORS = [
+    'captcha',
+    'challenge-form',
+    'cf-challenge',  # Cloudflare
+    'verify you are human',
+    'security check',
+    'robot verification'
+]
+# One case-insensitive pass over the page instead of a lowercased copy and a scan per marker
+CAPTCHA_RE = re.compile('|'.join(map(re.escape, CAPTCHA_INDICATORS)), re.IGNORECASE)
+# Characters allowed in a domain label (hyphens only in the middle)
+DOMAIN_LABEL_CHARS = frozenset(string.ascii_letters + string.digits + '-')
+
 # User agents for rotation
-USER_AGENTS = [
+USER_AGENTS: Final[Tuple[str, ...]] = (
     'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36',
     'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36',
     'Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:122.0) Gecko/20100101 Firefox/122.0',
     'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.2.1 Safari/605.1.15',
     'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36'
-]
+)
+
+# Random user agent picks are drawn in batches and handed out one at a time
+USER_AGENT_BATCH_SIZE = 1024
+_UA_RNG = random.Random()
+_user_agent_picks: Iterator[str] = iter(())
+
+
+# Keep-alive session reused by every HTTP scraper on the same event loop
+_shared_session: Optional[aiohttp.ClientSession] = None
+_shared_session_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def get_shared_session() -> aiohttp.ClientSession:
+    """Return the shared session for the running event loop, creating it on first use."""
+    global _shared_session, _shared_session_loop
+    
+    loop = asyncio.get_running_loop()
+    if _shared_session is None or _shared_session.closed or _shared_session_loop is not loop:
+        connector = aiohttp.TCPConnector(
+            limit=100,
+            limit_per_host=20,
+            ttl_dns_cache=300,
+            keepalive_timeout=300
+        )
+        _shared_session = aiohttp.ClientSession(connector=connector)
+        _shared_session_loop = loop
+    return _shared_session
+
+
+async def close_shared_session() -> None:
+    """Close the shared session, if one is open."""
+    global _shared_session, _shared_session_loop
+    
+    if _shared_session is not None and not _shared_session.closed:
+        await _shared_session.close()
+    _shared_session = _shared_session_loop = None
 
 
 class RateLimiter:
     """Simple rate limiter with configurable delay."""
     
+    __slots__ = ('min_delay', 'max_delay', '_span', '_rng', 'last_request', '_lock', '_lock_loop')
+    
     def __init__(self, min_delay: float = 2.0, max_delay: float = 4.0):
         self.min_delay = min_delay
         self.max_delay = max_delay
-        self.last_request = 0.0
+        self._span = max_delay - min_delay
+        # Private generator: jitter draws don't touch the shared module-level random state
+        self._rng = random.Random()
+        # Monotonic timestamp of the last request; -inf so the first one never waits
+        self.last_request = float('-inf')
+        # Created in await_slot() per running loop: an asyncio.Lock binds to the loop that first contends on it
+        self._lock: Optional[asyncio.Lock] = None
+        self._lock_loop: Optional[asyncio.AbstractEventLoop] = None
     
-    def wait(self) -> None:
-        """Wait if necessary to respect rate limit."""
-        now = time.time()
-        elapsed = now - self.last_request
-        delay = random.uniform(self.min_delay, self.max_delay)
+    def _compute_delay(self) -> float:
+        """Seconds to sleep before the next request is allowed (0 if none)."""
+        elapsed = time.monotonic() - self.last_request
+        delay = self.min_delay + self._rng.random() * self._span
         
         if elapsed < delay:
             sleep_time = delay - elapsed
-            logging.debug(f"Rate limiting: sleeping for {sleep_time:.2f}s")
+            logger.debug("Rate limiting: sleeping for %.2fs", sleep_time)
+            return sleep_time
+        return 0.0
+    
+    def wait(self) -> None:
+        """Wait if necessary to respect rate limit."""
+        sleep_time = self._compute_delay()
+        if sleep_time:
             time.sleep(sleep_time)
         
-        self.last_request = time.time()
+        self.last_request = time.monotonic()
+    
+    async def await_slot(self) -> None:
+        """Async counterpart of wait() that sleeps without blocking the event loop."""
+        loop = asyncio.get_running_loop()
+        if self._lock is None or self._lock_loop is not loop:
+            self._lock, self._lock_loop = asyncio.Lock(), loop
+        async with self._lock:
+            sleep_time = self._compute_delay()
+            if sleep_time:
+                await asyncio.sleep(sleep_time)
+            
+            self.last_request = time.monotonic()
+
+
+class TokenBucketRateLimiter:
+    """Token bucket allowing bursts of max_tokens, refilled evenly over refill_interval seconds."""
+    
+    def __init__(self, max_tokens: int = 20, refill_interval: float = 1.0):
+        self.max_tokens = max_tokens
+        self.refill_interval = refill_interval
+        self._tokens = float(max_tokens)
+        self._updated = time.monotonic()
+        # Created lazily for the same reason as RateLimiter._lock
+        self._lock: Optional[asyncio.Lock] = None
+        self._lock_loop: Optional[asyncio.AbstractEventLoop] = None
+    
+    async def await_slot(self) -> None:
+        """Wait until a token is available and take it."""
+        loop = asyncio.get_running_loop()
+        if self._lock is None or self._lock_loop is not loop:
+            self._lock, self._lock_loop = asyncio.Lock(), loop
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                refill = (now - self._updated) * self.max_tokens / self.refill_interval
+                self._tokens = min(self.max_tokens, self._tokens + refill)
+                self._updated = now
+                
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                
+                await asyncio.sleep((1 - self._tokens) * self.refill_interval / self.max_tokens)
+    
+    async def __aenter__(self):
+        await self.await_slot()
+        return self
+    
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        return None
 
 
 def retry_on_exception(
@@ -54,46 +219,165 @@ def retry_on_exception(
     backoff: float = 2.0,
     exceptions: tuple = (Exception,)
 ) -> Callable[[F], F]:
-    """Decorator to retry function on exception with exponential backoff."""
+    """Decorator to retry a sync or async function on exception with jittered backoff."""
+    if max_attempts < 1:
+        raise ValueError(f"max_attempts must be at least 1, got {max_attempts}")
+    
+    def next_delay(current_delay: float) -> float:
+        # Decorrelated jitter keeps concurrent retries against one API from lining up
+        return random.uniform(delay, current_delay * backoff)
+    
+    def log_failure(
+        logger: logging.Logger,
+        func: Callable[..., Any],
+        attempt: int,
+        current_delay: float,
+        e: Exception
+    ) -> None:
+        # %-style args: the message (and str(e)) is only built if the level is enabled
+        if attempt >= max_attempts:
+            logger.error("%s failed after %d attempts: %s", func.__name__, max_attempts, e)
+        else:
+            logger.warning(
+                "%s attempt %d failed: %s. Retrying in %.2fs...",
+                func.__name__, attempt, e, current_delay
+            )
+    
     def decorator(func: F) -> F:
+        logger = logging.getLogger(func.__module__)
+        
+        if inspect.iscoroutinefunction(func):
+            @wraps(func)
+            async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+                attempt = 1
+                current_delay = delay
+                
+                while True:
+                    try:
+                        return await func(*args, **kwargs)
+                    except exceptions as e:
+                        log_failure(logger, func, attempt, current_delay, e)
+                        if attempt >= max_attempts:
+                            raise
+                        
+                        await asyncio.sleep(current_delay)
+                        current_delay = next_delay(current_delay)
+                        attempt += 1
+            
+            return cast(F, async_wrapper)
+        
         @wraps(func)
         def wrapper(*args: Any, **kwargs: Any) -> Any:
             attempt = 1
             current_delay = delay
             
-            while attempt <= max_attempts:
+            while True:
                 try:
                     return func(*args, **kwargs)
                 except exceptions as e:
-                    if attempt == max_attempts:
-                        logging.error(f"{func.__name__} failed after {max_attempts} attempts: {e}")
+                    log_failure(logger, func, attempt, current_delay, e)
+                    if attempt >= max_attempts:
                         raise
                     
-                    logging.warning(
-                        f"{func.__name__} attempt {attempt} failed: {e}. "
-                        f"Retrying in {current_delay:.2f}s..."
-                    )
                     time.sleep(current_delay)
-                    current_delay *= backoff
+                    current_delay = next_delay(current_delay)
                     attempt += 1
-            
-            return None  # This should never be reached
         
         return cast(F, wrapper)
     return decorator
 
 
+def loads_json(data: Union[bytes, str]) -> Any:
+    """Decode a JSON document, using orjson when available."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def json_dumps(value: Any) -> str:
+    """Encode a value as compact JSON text, using orjson when available."""
+    if orjson is not None:
+        return orjson.dumps(value).decode()
+    return json.dumps(value, separators=(',', ':'))
+
+
+def _parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Convert a Retry-After header (seconds or HTTP date) to a delay in seconds."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+async def with_backoff(
+    op: Callable[[], Awaitable[Any]],
+    max_retries: int = 5,
+    base: float = 1.0,
+    cap: float = 32.0
+) -> Any:
+    """Await an HTTP request, retrying 429/5xx responses with jittered exponential backoff.
+    
+    op must return an aiohttp-style response. Retry-After is honored when present, up to cap.
+    The final response is returned unchanged once retries are exhausted.
+    """
+    attempt = 0
+    while True:
+        response = await op()
+        if response.status not in RETRYABLE_STATUSES or attempt >= max_retries:
+            return response
+        
+        retry_after = _parse_retry_after(response.headers.get('Retry-After'))
+        if retry_after is not None:
+            # Never let a server-chosen wait stall the scrape beyond the backoff cap
+            delay = min(cap, retry_after)
+        else:
+            delay = min(cap, base * 2 ** attempt) + random.random() * 0.5
+        
+        logger.warning(
+            "HTTP %d, retrying in %.2fs (attempt %d/%d)",
+            response.status, delay, attempt + 1, max_retries
+        )
+        response.release()
+        await asyncio.sleep(delay)
+        attempt += 1
+
+
 def get_random_user_agent() -> str:
     """Get a random user agent string."""
-    return random.choice(USER_AGENTS)
+    global _user_agent_picks
+    try:
+        return next(_user_agent_picks)
+    except StopIteration:
+        _user_agent_picks = iter(_UA_RNG.choices(USER_AGENTS, k=USER_AGENT_BATCH_SIZE))
+        return next(_user_agent_picks)
 
 
 def extract_domain(url: str) -> Optional[str]:
     """Extract root domain from URL."""
+    # API payloads can carry non-strings here; lru_cache would raise on unhashable ones
+    if not isinstance(url, str):
+        return None
+    return _extract_domain_cached(url)
+
+
+@lru_cache(maxsize=4096)
+def _extract_domain_cached(url: str) -> Optional[str]:
+    """Cached body of extract_domain for string URLs."""
     try:
-        parsed = urlparse(url)
+        # Plain http(s) URLs are the common case; anything unusual goes through urlparse
+        match = URL_NETLOC_RE.match(url)
+        netloc = match.group(1) if match else urlparse(url).netloc
         # Remove www. prefix if present
-        domain = parsed.netloc.lower()
+        domain = netloc.lower()
         if domain.startswith('www.'):
             domain = domain[4:]
         return domain
@@ -101,11 +385,36 @@ def extract_domain(url: str) -> Optional[str]:
         return None
 
 
+def coerce_http_url(url: Any) -> Optional[str]:
+    """Return url if it looks like an absolute http(s) URL, otherwise None."""
+    if isinstance(url, str) and HTTP_URL_RE.match(url):
+        return url
+    return None
+
+
 def normalize_url(url: str) -> str:
     """Normalize URL for consistency."""
     if not url.startswith(('http://', 'https://')):
         url = 'https://' + url
     
+    # Rewrite in one pass; odd hosts, path params and unprintable characters take the slow path
+    match = URL_PARTS_RE.match(url)
+    if match is None or not url.isprintable():
+        return _normalize_url_with_urlparse(url)
+    
+    scheme, netloc, path, query = match.groups()
+    if not netloc or '[' in netloc or ']' in netloc or ';' in path:
+        return _normalize_url_with_urlparse(url)
+    
+    # Ensure lowercase domain, drop trailing slashes, empty query and fragment
+    normalized = scheme + netloc.lower() + path.rstrip('/')
+    if query:
+        normalized += '?' + query
+    return normalized
+
+
+def _normalize_url_with_urlparse(url: str) -> str:
+    """urlparse-based normalize_url for URLs the single-pass rewrite does not handle."""
     parsed = urlparse(url)
     # Ensure lowercase domain
     normalized = urlunparse((
@@ -122,39 +431,28 @@ def normalize_url(url: str) -> str:
 
 def extract_email_from_text(text: str) -> Optional[str]:
     """Extract first email address from text."""
-    email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-    match = re.search(email_pattern, text)
+    # A C-level substring scan rules out most pages before the regex runs
+    if '@' not in text:
+        return None
+    match = EMAIL_RE.search(text)
     return match.group(0) if match else None
 
 
 def extract_phone_from_text(text: str) -> Optional[str]:
     """Extract first phone number from text (US format)."""
-    # Matches various US phone formats
-    phone_patterns = [
-        r'\b\d{3}[-.\s]?\d{3}[-.\s]?\d{4}\b',  # 123-456-7890
-        r'\b\(\d{3}\)\s?\d{3}[-.\s]?\d{4}\b',   # (123) 456-7890
-        r'\b\+1\s?\d{3}[-.\s]?\d{3}[-.\s]?\d{4}\b',  # +1 123-456-7890
-    ]
-    
-    for pattern in phone_patterns:
-        match = re.search(pattern, text)
+    for pattern in PHONE_RES:
+        match = pattern.search(text)
         if match:
             return match.group(0)
     
     return None
 
 
+@lru_cache(maxsize=4096)
 def clean_company_name(name: str) -> str:
     """Clean and normalize company name."""
     # Remove common suffixes
-    suffixes = [
-        r'\s+(?:Inc|LLC|Ltd|Limited|Corp|Corporation|Co|Company)\.?$',
-        r'\s+(?:GmbH|AG|S\.A\.|S\.L\.|B\.V\.)$'
-    ]
-    
-    cleaned = name.strip()
-    for suffix in suffixes:
-        cleaned = re.sub(suffix, '', cleaned, flags=re.IGNORECASE)
+    cleaned = COMPANY_SUFFIX_RE.sub('', name.strip())
     
     # Remove extra whitespace
     cleaned = ' '.join(cleaned.split())
@@ -167,26 +465,23 @@ def is_valid_domain(domain: str) -> bool:
     if not domain or '.' not in domain:
         return False
     
-    # Basic validation
-    domain_pattern = r'^[a-zA-Z0-9]([a-zA-Z0-9-]{0,61}[a-zA-Z0-9])?(\.[a-zA-Z0-9]([a-zA-Z0-9-]{0,61}[a-zA-Z0-9])?)*$'
-    return bool(re.match(domain_pattern, domain))
+    # Basic validation: a linear check per label, with no regex backtracking
+    return all(_is_valid_label(label) for label in domain.split('.'))
+
+
+def _is_valid_label(label: str) -> bool:
+    """Check one dot-separated domain label: 1-63 letters, digits or inner hyphens."""
+    return (
+        0 < len(label) <= 63
+        and label[0] != '-'
+        and label[-1] != '-'
+        and DOMAIN_LABEL_CHARS.issuperset(label)
+    )
 
 
 def detect_captcha_block(html: str) -> bool:
     """Detect if page contains CAPTCHA challenge."""
-    captcha_indicators = [
-        'captcha',
-        'recaptcha',
-        'hcaptcha',
-        'challenge-form',
-        'cf-challenge',  # Cloudflare
-        'verify you are human',
-        'security check',
-        'robot verification'
-    ]
-    
-    html_lower = html.lower()
-    return any(indicator in html_lower for indicator in captcha_indicators)
+    return CAPTCHA_RE.search(html) is not None
 
 
 def setup_logger(name: str, level: int = logging.INFO) -> logging.Logger: